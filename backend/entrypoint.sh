@@ -1,11 +1,24 @@
 #!/bin/bash
-# Clean up any stale X lock files
-rm -f /tmp/.X99-lock /tmp/.X11-unix/X99
-# Start Xvfb in background
-Xvfb :99 -screen 0 1920x1080x24 -ac +extension GLX +render -noreset &
+# Number of virtual displays for headful browsers: one per core, but no more
+# than the browser contexts the pool opens at once (BROWSER_MAX_CONTEXTS)
+MAX_CONTEXTS=${BROWSER_MAX_CONTEXTS:-4}
+CORES=$(nproc)
+XVFB_DISPLAYS=${XVFB_DISPLAYS:-$(( CORES < MAX_CONTEXTS ? CORES : MAX_CONTEXTS ))}
+XVFB_FIRST_DISPLAY=${XVFB_FIRST_DISPLAY:-99}
+
+DISPLAY_LIST=""
+for ((i = 0; i < XVFB_DISPLAYS; i++)); do
+    n=$((XVFB_FIRST_DISPLAY + i))
+    # Clean up any stale X lock files
+    rm -f /tmp/.X${n}-lock /tmp/.X11-unix/X${n}
+    # Start Xvfb in background
+    Xvfb :${n} -screen 0 1920x1080x24 -ac +extension GLX +render -noreset &
+    DISPLAY_LIST="${DISPLAY_LIST:+${DISPLAY_LIST},}:${n}"
+done
 # Wait for Xvfb to be ready
 sleep 3
-# Export DISPLAY
-export DISPLAY=:99
+# Export DISPLAY (first display) and the pool the backend leases from
+export DISPLAY=:${XVFB_FIRST_DISPLAY}
+export XVFB_DISPLAY_LIST=${DISPLAY_LIST}
 # Execute the main command
 exec "$@"
@@ -1,21 +1,51 @@
-from fastapi import FastAPI
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List, Literal, Optional
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # --- SERVICES ---
-from services.cargoes_flow import get_sea_shipment
-from services.ai_service import parse_tracking_data
-from services.date_utils import standardize_date, dates_are_equal, calculate_date_difference, get_date_range
-from services.holiday_utils import get_holidays_between_dates, format_holidays_for_summary
-
-# --- SEA DRIVERS ---
-from services.sea.msc import drive_msc
-from services.sea.hapag import drive_hapag
-from services.sea.cma import drive_cma
-from services.sea.hmm import drive_hmm
-from services.sea.evergreen import drive_evergreen
-
-app = FastAPI(title="MP Cargo V2.0")
+from services.tracking import track_container, track_many, lookups, result_cache, normalize_container
+from services.jobs import job_manager
+from services.history import history
+from services.cargoes_flow import negative_cache, breaker, rate_limiter
+from services.http_client import get_client, close_clients, pool_stats
+from services.cargoes_mirror import cargoes_mirror
+from services import cargoes_webhook, webhook_signing
+from services.browser_pool import browser_pool
+from services.page_pool import page_pool
+from services.storage_state import storage_states
+from services.consent import consent_killer
+from services.selector_race import selector_cache
+from services.behaviour import profile_timings
+from services.ai_service import parse_cache, batch_parser
+from services.eta_extractors import extractor_stats
+from services.text_reducer import reduction_stats
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the shared Cargoes Flow client up front so the first lookup reuses it
+    get_client("cargoes_flow")
+    await browser_pool.start()
+    # Drivers registered their carriers on import (via services.tracking)
+    await page_pool.start()
+    await cargoes_mirror.start()
+    await job_manager.start()
+    yield
+    await job_manager.stop()
+    await cargoes_mirror.stop()
+    await page_pool.stop()
+    await browser_pool.stop()
+    await close_clients()
+    # Selector wins not yet written by the debounced save
+    selector_cache.save()
+
+
+app = FastAPI(title="MP Cargo V2.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +59,8 @@ class TrackRequest(BaseModel):
     number: str
     carrier: str = "Unknown"
     system_eta: str = "N/A"
+    # Driver behaviour profile (default per carrier)
+    profile: Optional[Literal["stealth", "balanced", "fast"]] = None
 
 
 @app.get("/health")
@@ -36,156 +68,135 @@ async def health_check():
     """
     Lightweight health endpoint for frontend connectivity status.
     """
-    return {"status": "ok", "version": "v2.0"}
+    return {
+        "status": "ok",
+        "version": "v2.0",
+        "cargoes_flow": breaker.state,
+    }
+
+@app.get("/api/stats")
+async def stats():
+    """Runtime counters for the tracking pipeline."""
+    return {
+        "lookups": lookups.stats(),
+        "result_cache": result_cache.stats(),
+        "parse_cache": parse_cache.stats(),
+        "eta_extractors": extractor_stats.stats(),
+        "prompt_reduction": reduction_stats.stats(),
+        "parse_batches": batch_parser.stats(),
+        "cargoes_flow_negative_cache": negative_cache.stats(),
+        "cargoes_flow_breaker": breaker.stats(),
+        "cargoes_flow_rate_limiter": rate_limiter.stats(),
+        "http_pools": pool_stats(),
+        "cargoes_mirror": cargoes_mirror.stats(),
+        "browser_pool": browser_pool.stats(),
+        "page_pool": page_pool.stats(),
+        "storage_state": storage_states.stats(),
+        "consent_clicks": consent_killer.stats(),
+        "selector_winners": selector_cache.stats(),
+        "driver_profiles": profile_timings.stats(),
+    }
 
 @app.post("/api/track/sea")
 async def track_sea(request: TrackRequest):
-    # ---------------------------------------------------------
-    # TIER 1: CARGOES FLOW API (The Fast Lane)
-    # ---------------------------------------------------------
-    data = await get_sea_shipment(request.number)
-    if data:
-        live_eta = data.get("eta", "N/A")
-        co2 = data.get("co2", "N/A")
-        status = data.get("status")
-        sub_status = data.get("sub_status", "")
-        
-        # Standardize system ETA if provided
-        system_eta_standardized = standardize_date(request.system_eta)
-        
-        # Compare ETAs
-        eta_changed = not dates_are_equal(request.system_eta, live_eta)
-        
-        # Calculate holidays if ETA changed
-        holidays_info = "No holidays between dates"
-        if eta_changed:
-            start_date, end_date = get_date_range(request.system_eta, live_eta)
-            if start_date and end_date:
-                holidays = get_holidays_between_dates(start_date, end_date)
-                holidays_info = format_holidays_for_summary(holidays)
-        
-        # Generate smart summary using AI if ETA changed, otherwise simple summary
-        if eta_changed and data.get("raw_data"):
-            print("   🧠 ETA changed - generating detailed AI summary...")
-            # Use AI to generate enhanced summary
-            ai_result = await parse_tracking_data(
-                str(data.get("raw_data")),
-                request.carrier,
-                system_eta=system_eta_standardized,
-                live_eta=live_eta,
-                holidays_info=holidays_info
-            )
-            smart_summary = ai_result.get("summary", f"Status: {sub_status}")
-        else:
-            # Simple summary for unchanged ETA
-            smart_summary = f"Status: {sub_status}" if sub_status else f"Status: {status}"
-        
-        return {
-            "tracking_number": request.number,
-            "carrier": request.carrier,
-            "status": status,
-            "live_eta": live_eta,
-            "co2": co2,
-            "eta_changed": eta_changed,
-            "smart_summary": smart_summary,
-            "raw_data_snippet": "Source: Cargoes Flow API"
-        }
-
-    # CMA fallback: if Cargoes Flow has no data, skip browser driver
-    carrier_name = request.carrier.lower()
-    if "cma" in carrier_name:
-        print("   ⚠️ CMA not in Cargoes Flow. Skipping driver; manual check required.")
-        return {
-            "source": "System",
-            "status": "Manual Check Required",
-            "co2": "N/A",
-            "eta_changed": False,
-            "message": "CMA CGM container not found in Cargoes Flow API. Please check manually at: https://www.cma-cgm.com/ebusiness/tracking"
-        }
-
-    # ---------------------------------------------------------
-    # TIER 2: OFFICIAL DRIVERS (The Custom Scripts)
-    # ---------------------------------------------------------
-    print("   🐢 API didn't have data. Switching to Official Driver...")
-
-    scrape_data = None
-
-    # Routing Logic
-    if "msc" in carrier_name:
-        scrape_data = await drive_msc(request.number)
-    elif "hapag" in carrier_name:
-        scrape_data = await drive_hapag(request.number)
-    elif "cma" in carrier_name:
-        scrape_data = await drive_cma(request.number)
-    elif "hmm" in carrier_name or "hyundai" in carrier_name:
-        scrape_data = await drive_hmm(request.number)
-    elif "evergreen" in carrier_name or "ever" in carrier_name:
-        scrape_data = await drive_evergreen(request.number)
-
-    # ---------------------------------------------------------
-    # AI PARSING & RESPONSE
-    # ---------------------------------------------------------
-    if scrape_data and scrape_data.get("raw_data"):
-        print("   🧠 Sending raw text to AI for analysis...")
-        
-        # Standardize system ETA if provided
-        system_eta_standardized = standardize_date(request.system_eta)
-
-        # First, get basic parsing to extract live ETA
-        ai_result = await parse_tracking_data(
-            scrape_data["raw_data"], 
-            request.carrier,
-            system_eta=system_eta_standardized,
-            live_eta="Extracting...",
-            holidays_info="Calculating..."
-        )
-        
-        live_eta = standardize_date(ai_result.get("latest_date", "N/A"))
-        co2 = ai_result.get("co2", "N/A")
-        
-        # Compare ETAs
-        eta_changed = not dates_are_equal(request.system_eta, live_eta)
-        
-        # Calculate holidays if ETA changed
-        holidays_info = "No holidays between dates"
-        if eta_changed:
-            start_date, end_date = get_date_range(request.system_eta, live_eta)
-            if start_date and end_date:
-                holidays = get_holidays_between_dates(start_date, end_date)
-                holidays_info = format_holidays_for_summary(holidays)
-                
-                # Re-generate summary with holiday info if ETA changed
-                print("   🧠 ETA changed - regenerating summary with holiday info...")
-                ai_result = await parse_tracking_data(
-                    scrape_data["raw_data"],
-                    request.carrier,
-                    system_eta=system_eta_standardized,
-                    live_eta=live_eta,
-                    holidays_info=holidays_info
-                )
-
-        return {
-            "tracking_number": request.number,
-            "carrier": request.carrier,
-            "status": ai_result.get("status"),
-            "live_eta": live_eta,
-            "co2": co2,
-            "eta_changed": eta_changed,
-            "smart_summary": ai_result.get("summary"),
-            "raw_data_snippet": "Source: Official Driver"
-        }
-
-    # If API failed AND Driver failed/doesn't exist
-    # Provide helpful message based on carrier
-    if "cma" in carrier_name:
-        message = "CMA CGM container not found in API. Browser automation blocked by WAF. Please check manually at: https://www.cma-cgm.com/ebusiness/tracking"
-    else:
-        message = "Container not found in API, and no Official Driver available."
-    
-    return {
-        "source": "System",
-        "status": "Manual Check Required" if "cma" in carrier_name else "Not Found",
-        "co2": "N/A",
-        "eta_changed": False,
-        "message": message
-    }
\ No newline at end of file
+    return await track_container(request.number, request.carrier, request.system_eta, request.profile)
+
+@app.post("/api/track/sea/batch")
+async def track_sea_batch(requests: List[TrackRequest]):
+    """
+    Tracks many containers concurrently.
+    Streams one NDJSON line per container as soon as it finishes;
+    each line carries the `index` of the request it answers.
+    """
+    async def stream():
+        async for index, result in track_many([(r.number, r.carrier, r.system_eta, r.profile) for r in requests]):
+            yield json.dumps({"index": index, **result}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.get("/api/history/{container}")
+async def shipment_history(container: str, since: float = 0):
+    """Latest known state of a container plus its ETA/status change history."""
+    container = normalize_container(container)
+    latest = history.latest(container)
+    if not latest:
+        raise HTTPException(status_code=404, detail="No history for this container")
+    latest.pop("snapshot")
+    return {"latest": latest, "changes": history.changes(container, since)}
+
+@app.post("/api/webhooks/cargoes-flow")
+async def cargoes_flow_webhook(request: Request):
+    """
+    Receives Cargoes Flow shipment-update pushes.
+    The raw body must be signed with CARGOES_FLOW_WEBHOOK_SECRET (HMAC-SHA256).
+    """
+    body = await request.body()
+    signature = request.headers.get(webhook_signing.WEBHOOK_SIGNATURE_HEADER, "")
+    if not webhook_signing.verify_signature(body, signature):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    try:
+        payload = json.loads(body)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Payload is not valid JSON")
+
+    cargoes_webhook.record_payload(body)
+    updated = cargoes_webhook.ingest(payload)
+    return {"status": "ok", "updated": updated}
+
+# ---------------------------------------------------------
+# BACKGROUND JOBS
+# ---------------------------------------------------------
+@app.post("/api/jobs")
+async def submit_job(requests: List[TrackRequest]):
+    """Queues containers for background tracking and returns a job id to poll."""
+    job_id = job_manager.submit([(r.number, r.carrier, r.system_eta, r.profile) for r in requests])
+    return {"job_id": job_id, "total": len(requests)}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Server-Sent Events stream of per-container progress.
+    Sends the current snapshot first, then one event per container update.
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def stream():
+        queue = job_manager.subscribe(job_id)
+        try:
+            snapshot = job_manager.get(job_id)
+            yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+            if snapshot["status"] in ("completed", "cancelled"):
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Keep proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+                if event["event"] in ("completed", "cancelled"):
+                    return
+        finally:
+            job_manager.unsubscribe(job_id, queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    cancelled = job_manager.cancel(job_id)
+    if cancelled is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not cancelled:
+        raise HTTPException(status_code=409, detail=f"Job already {job_manager.get(job_id)['status']}")
+    return job_manager.get(job_id)
@@ -0,0 +1,128 @@
+"""
+Accuracy and speed check for the rule-based ETA extractors.
+
+Runs services/eta_extractors.py over a corpus of saved driver outputs:
+files written when DRIVER_CORPUS_DIR is set (<carrier>_<container>_<ts>.txt)
+and the /tmp/hmm_response_*.txt debug files drive_hmm writes.
+
+Expected answers live in a labels JSON file ({filename: {"latest_date",
+"status"}}). --label-with-llm fills in missing labels with the LLM parser
+(one paid call per unlabelled file) so the extractors can be scored against it.
+
+Usage:
+    python scripts/eval_extractors.py corpus/ /tmp/hmm_response_*.txt --labels corpus/labels.json
+"""
+import os
+import sys
+import glob
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from services.eta_extractors import extractor_for, EXTRACTOR_MIN_CONFIDENCE  # noqa: E402
+from services.date_utils import dates_are_equal  # noqa: E402
+
+HMM_DEBUG_SEPARATOR = "=" * 80
+
+
+def load_corpus(paths, carrier_override=None):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.txt"))))
+        else:
+            files.append(path)
+
+    corpus = []
+    for path in files:
+        name = os.path.basename(path)
+        carrier = carrier_override or name.split("_", 1)[0]
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        # drive_hmm's debug files start with a small header
+        if HMM_DEBUG_SEPARATOR in text[:500]:
+            text = text.split(HMM_DEBUG_SEPARATOR, 1)[1]
+        corpus.append((name, carrier, text))
+    return corpus
+
+
+async def label_with_llm(corpus, labels):
+    from services.ai_service import parse_tracking_data
+
+    for name, carrier, text in corpus:
+        if name in labels:
+            continue
+        result = await parse_tracking_data(text, carrier, use_extractors=False)
+        labels[name] = {"latest_date": result.get("latest_date"), "status": result.get("status")}
+        print(f"labelled {name}: {labels[name]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score the rule-based ETA extractors on saved driver outputs.")
+    parser.add_argument("paths", nargs="*", default=[os.getenv("DRIVER_CORPUS_DIR", "corpus")])
+    parser.add_argument("--labels", help="JSON file of expected results per file name")
+    parser.add_argument("--label-with-llm", action="store_true", help="Label unlabelled files with the LLM and save them")
+    parser.add_argument("--carrier", help="Treat every file as this carrier")
+    parser.add_argument("--repeat", type=int, default=20, help="Extractions per file for timing")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.paths, args.carrier)
+    if not corpus:
+        sys.exit("No corpus files found")
+
+    labels = {}
+    if args.labels and os.path.exists(args.labels):
+        with open(args.labels) as f:
+            labels = json.load(f)
+    if args.label_with_llm:
+        if not args.labels:
+            sys.exit("--label-with-llm needs --labels to save to")
+        asyncio.run(label_with_llm(corpus, labels))
+        with open(args.labels, "w") as f:
+            json.dump(labels, f, indent=2)
+
+    totals = {}
+    for name, carrier, text in corpus:
+        extractor = extractor_for(carrier)
+        if extractor is None:
+            print(f"skip  {name}: no extractor for '{carrier}'")
+            continue
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            result = extractor.extract(text)
+        micros = (time.perf_counter() - started) / args.repeat * 1e6
+
+        confident = result["confidence"] >= EXTRACTOR_MIN_CONFIDENCE
+        expected = labels.get(name)
+        verdict = "-"
+        if expected and confident:
+            correct = dates_are_equal(result["latest_date"], expected["latest_date"]) and \
+                result["status"] == expected["status"]
+            verdict = "ok" if correct else "WRONG"
+
+        t = totals.setdefault(extractor.name, {"files": 0, "confident": 0, "labelled": 0, "correct": 0, "micros": 0.0})
+        t["files"] += 1
+        t["confident"] += confident
+        t["micros"] += micros
+        if verdict != "-":
+            t["labelled"] += 1
+            t["correct"] += verdict == "ok"
+
+        expected_text = f" expected {expected['latest_date']} / {expected['status']}" if expected else ""
+        print(f"{verdict:5} {name}: {result['latest_date']} / {result['status']} "
+              f"(confidence {result['confidence']}, {micros:.0f} us){expected_text}")
+
+    print()
+    print(f"{'carrier':10} {'files':>5} {'coverage':>9} {'accuracy':>9} {'avg us':>8}")
+    for carrier, t in sorted(totals.items()):
+        coverage = t["confident"] / t["files"]
+        accuracy = f"{t['correct'] / t['labelled']:.0%}" if t["labelled"] else "n/a"
+        print(f"{carrier:10} {t['files']:>5} {coverage:>9.0%} {accuracy:>9} {t['micros'] / t['files']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
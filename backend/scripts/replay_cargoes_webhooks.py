@@ -0,0 +1,61 @@
+"""
+Local stand-in for Cargoes Flow webhook pushes.
+
+Replays recorded payloads (e.g. the files written when
+CARGOES_FLOW_WEBHOOK_RECORD_DIR is set) against a running backend,
+signed the same way Cargoes Flow would sign them.
+
+Usage:
+    python scripts/replay_cargoes_webhooks.py recordings/ --url http://localhost:8000/api/webhooks/cargoes-flow
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from services.webhook_signing import sign_payload  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded Cargoes Flow webhook payloads.")
+    parser.add_argument("paths", nargs="+", help="JSON payload files or directories of them")
+    parser.add_argument("--url", default="http://localhost:8000/api/webhooks/cargoes-flow")
+    parser.add_argument("--secret", default=os.getenv("CARGOES_FLOW_WEBHOOK_SECRET", ""))
+    parser.add_argument("--header", default=os.getenv("CARGOES_FLOW_WEBHOOK_SIGNATURE_HEADER", "X-Cargoes-Signature"))
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait between pushes")
+    args = parser.parse_args()
+
+    if not args.secret:
+        sys.exit("No secret: pass --secret or set CARGOES_FLOW_WEBHOOK_SECRET")
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.json"))))
+        else:
+            files.append(path)
+
+    with httpx.Client() as client:
+        for path in files:
+            with open(path, "rb") as f:
+                body = f.read()
+            response = client.post(
+                args.url,
+                content=body,
+                headers={"Content-Type": "application/json", args.header: sign_payload(body, args.secret)},
+            )
+            print(f"{response.status_code} {os.path.basename(path)} -> {response.text}")
+            if args.delay:
+                time.sleep(args.delay)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
 import os
+import re
 import json
+import hashlib
 from datetime import datetime
 from openai import AsyncOpenAI
 from dotenv import load_dotenv
+from services.cache import TTLCache
+from services.eta_extractors import extract_eta
+from services.text_reducer import reduce_raw_text, reduction_stats
+from services.batch_parser import BatchParser, batching_enabled
 
 load_dotenv()
 
@@ -34,7 +40,66 @@ JSON OUTPUT:
 }
 """
 
-async def parse_tracking_data(raw_text: str, carrier: str, system_eta: str = "N/A", live_eta: str = "N/A", holidays_info: str = "No holidays between dates"):
+# Appended to SYSTEM_PROMPT when several containers share one completion
+BATCH_INSTRUCTIONS = """
+BATCH MODE:
+You will receive several containers, each starting with a "### <key>" line.
+Apply the rules to each container on its own. Return ONE JSON object with
+every key mapped to that container's output, e.g.
+{"c1": {"latest_date": "...", "status": "...", "summary": "..."}, "c2": {...}}
+"""
+
+PARSE_MODEL = "gpt-4o-mini"
+# Changes whenever the prompt or model does, so old answers are never reused
+PROMPT_VERSION = hashlib.sha256(f"{PARSE_MODEL}\n{SYSTEM_PROMPT}".encode("utf-8")).hexdigest()[:12]
+
+# Parsed results keyed by the content they were parsed from: an unchanged
+# carrier page (or the second parse of the same page) never costs another call.
+PARSE_CACHE_TTL = float(os.getenv("PARSE_CACHE_TTL", "86400"))
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "2000"))
+PARSE_CACHE_PATH = os.getenv("PARSE_CACHE_PATH", "")
+
+parse_cache = TTLCache(
+    "Parses",
+    max_entries=PARSE_CACHE_MAX_ENTRIES,
+    disk_path=PARSE_CACHE_PATH
+)
+
+
+async def _complete_batch(items):
+    """One JSON-mode completion for [(key, carrier, prompt_text)]; returns {key: result}."""
+    today = datetime.now().strftime("%d-%b-%Y")
+    final_prompt = SYSTEM_PROMPT.replace("{{CURRENT_DATE}}", today) + BATCH_INSTRUCTIONS
+    content = "\n\n".join(
+        f"### {key}\nCarrier: {carrier}\n\nRaw Data:\n{prompt_text}"
+        for key, carrier, prompt_text in items
+    )
+    response = await client.chat.completions.create(
+        model=PARSE_MODEL,
+        messages=[
+            {"role": "system", "content": final_prompt},
+            {"role": "user", "content": content}
+        ],
+        response_format={"type": "json_object"},
+        temperature=0
+    )
+    return json.loads(response.choices[0].message.content)
+
+
+batch_parser = BatchParser(_complete_batch)
+
+
+def parse_cache_key(prompt_text: str, carrier: str, today: str) -> str:
+    """
+    Hash of everything the completion depends on: the whitespace-normalized
+    text the model sees, the carrier, the prompt version and today's date
+    (status is judged against it).
+    """
+    normalized = re.sub(r"\s+", " ", prompt_text).strip()
+    material = "\n".join([PROMPT_VERSION, carrier.strip().lower(), today, normalized])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+async def parse_tracking_data(raw_text: str, carrier: str, system_eta: str = "N/A", live_eta: str = "N/A", holidays_info: str = "No holidays between dates", use_extractors: bool = True):
     """
     Parse tracking data with AI and generate client-ready summaries.
     
@@ -44,6 +109,7 @@ async def parse_tracking_data(raw_text: str, carrier: str, system_eta: str = "N/
         system_eta: Original system ETA for comparison (kept for backward compatibility)
         live_eta: Current live ETA (kept for backward compatibility)
         holidays_info: Formatted holiday information between dates (kept for backward compatibility)
+        use_extractors: Try the rule-based carrier extractors before the LLM
     
     Returns:
         Dict with latest_date, status, co2, and summary
@@ -53,25 +119,49 @@ async def parse_tracking_data(raw_text: str, carrier: str, system_eta: str = "N/
         if not raw_text or len(raw_text) < 50:
              return {"latest_date": "N/A", "status": "Error", "summary": "No data extracted.", "co2": "N/A"}
 
+        # Carrier pages with a clearly labelled ETA don't need the model
+        extracted = extract_eta(raw_text, carrier) if use_extractors else None
+        if extracted:
+            print(f"   📐 {extracted['extractor']} extractor: {extracted['latest_date']} "
+                  f"(confidence {extracted['confidence']}), skipping AI call")
+            return extracted
+
+        # Only the event timeline goes to the model, not the page chrome
+        prompt_text, tokens_before, tokens_after = reduce_raw_text(raw_text)
+        reduction_stats.record(tokens_before, tokens_after)
+        if tokens_after < tokens_before:
+            print(f"   ✂️ Reduced raw text: ~{tokens_before} -> ~{tokens_after} tokens "
+                  f"(saved ~{tokens_before - tokens_after})")
+
         today = datetime.now().strftime("%d-%b-%Y")
-        final_prompt = SYSTEM_PROMPT.replace("{{CURRENT_DATE}}", today)
+        cache_key = parse_cache_key(prompt_text, carrier, today)
+        cached = parse_cache.get(cache_key)
+        if cached:
+            print("   🧠 Parse cache hit, skipping AI call")
+            return dict(cached.value)
 
-        response = await client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": final_prompt},
-                {"role": "user", "content": f"Carrier: {carrier}\n\nRaw Data:\n{raw_text[:4000]}"}
-            ],
-            response_format={"type": "json_object"},
-            temperature=0
-        )
-        result = json.loads(response.choices[0].message.content)
+        # Bulk runs share completions; None means "make your own call"
+        result = await batch_parser.parse(prompt_text, carrier) if batching_enabled() else None
+        if result is None:
+            final_prompt = SYSTEM_PROMPT.replace("{{CURRENT_DATE}}", today)
+
+            response = await client.chat.completions.create(
+                model=PARSE_MODEL,
+                messages=[
+                    {"role": "system", "content": final_prompt},
+                    {"role": "user", "content": f"Carrier: {carrier}\n\nRaw Data:\n{prompt_text}"}
+                ],
+                response_format={"type": "json_object"},
+                temperature=0
+            )
+            result = json.loads(response.choices[0].message.content)
         
         # Ensure co2 field exists for backward compatibility
         if "co2" not in result:
             result["co2"] = "N/A"
         
-        return result
+        parse_cache.set(cache_key, result, PARSE_CACHE_TTL)
+        return dict(result)
     except Exception as e:
         print(f"   ⚠️ AI Error: {e}")
         return {
@@ -0,0 +1,118 @@
+import os
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from services.text_reducer import estimate_tokens
+
+# Bulk runs pack several containers into one completion. A batch is sent
+# when its window closes, or earlier once it reaches the item/token limits.
+PARSE_BATCH_WINDOW = float(os.getenv("PARSE_BATCH_WINDOW_MS", "50")) / 1000
+PARSE_BATCH_MAX_TOKENS = int(os.getenv("PARSE_BATCH_MAX_TOKENS", "6000"))
+PARSE_BATCH_MAX_ITEMS = int(os.getenv("PARSE_BATCH_MAX_ITEMS", "8"))
+
+_batching = ContextVar("parse_batching", default=False)
+
+
+def batching_enabled() -> bool:
+    return _batching.get()
+
+
+@contextmanager
+def batching():
+    """Lets AI parses in the wrapped (bulk) run share batched completions."""
+    token = _batching.set(True)
+    try:
+        yield
+    finally:
+        _batching.reset(token)
+
+
+class BatchParser:
+    """
+    Collects concurrent parse requests for a short window and sends them as
+    one JSON-mode completion with a key per container.
+
+    `send(items)` gets [(key, carrier, prompt_text)] and returns {key: result}.
+    parse() resolves to that container's result, or None when the caller
+    should make its own single call: it was alone in its window, the batch
+    request failed, or its entry came back missing or malformed.
+    """
+
+    def __init__(self, send, window: float = PARSE_BATCH_WINDOW,
+                 max_tokens: int = PARSE_BATCH_MAX_TOKENS, max_items: int = PARSE_BATCH_MAX_ITEMS):
+        self._send = send
+        self.window = window
+        self.max_tokens = max_tokens
+        self.max_items = max_items
+        self._pending = []   # (carrier, prompt_text, future)
+        self._pending_tokens = 0
+        self._timer = None
+        self._tasks = set()
+        self.batches = 0
+        self.batched_items = 0
+        self.solo = 0
+        self.fallbacks = 0
+
+    async def parse(self, prompt_text: str, carrier: str):
+        loop = asyncio.get_running_loop()
+        tokens = estimate_tokens(prompt_text)
+        if self._pending and self._pending_tokens + tokens > self.max_tokens:
+            self._flush()
+
+        future = loop.create_future()
+        self._pending.append((carrier, prompt_text, future))
+        self._pending_tokens += tokens
+        if len(self._pending) >= self.max_items or self._pending_tokens >= self.max_tokens:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        items, self._pending, self._pending_tokens = self._pending, [], 0
+        if not items:
+            return
+        task = asyncio.ensure_future(self._run(items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, items):
+        items = [item for item in items if not item[2].done()]
+        if len(items) < 2:
+            self.solo += len(items)
+            for _, _, future in items:
+                future.set_result(None)
+            return
+
+        keys = [f"c{i + 1}" for i in range(len(items))]
+        print(f"   📦 Parsing {len(items)} containers in one AI call")
+        try:
+            results = await self._send([(key, carrier, text) for key, (carrier, text, _) in zip(keys, items)])
+            if not isinstance(results, dict):
+                raise ValueError("batch response is not a JSON object")
+        except Exception as e:
+            print(f"   ⚠️ Batch AI call failed, falling back to single calls: {e}")
+            results = {}
+
+        self.batches += 1
+        self.batched_items += len(items)
+        for key, (_, _, future) in zip(keys, items):
+            result = results.get(key)
+            valid = isinstance(result, dict) and "latest_date" in result and "status" in result
+            if not valid:
+                self.fallbacks += 1
+            if not future.done():
+                future.set_result(dict(result) if valid else None)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "batched_items": self.batched_items,
+            "avg_batch_size": round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+            "solo": self.solo,
+            "fallbacks": self.fallbacks,
+        }
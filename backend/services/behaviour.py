@@ -0,0 +1,82 @@
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class BehaviourProfile:
+    """
+    How "human" the driver helpers in services/utils.py act.
+    `delay_scale` multiplies human_delay() pauses (0 disables them);
+    `type_delay_ms` is the per-character typing range; `instant_fill`
+    replaces typing with fill() plus input/change events.
+    """
+
+    def __init__(self, name: str, delay_scale: float, type_delay_ms, verify_pause: float,
+                 mouse: bool, scroll: bool, instant_fill: bool = False):
+        self.name = name
+        self.delay_scale = delay_scale
+        self.type_delay_ms = type_delay_ms
+        self.verify_pause = verify_pause
+        self.mouse = mouse
+        self.scroll = scroll
+        self.instant_fill = instant_fill
+
+
+PROFILES = {
+    "stealth": BehaviourProfile("stealth", 1.0, (150, 300), 0.5, mouse=True, scroll=True),
+    "balanced": BehaviourProfile("balanced", 0.3, (40, 90), 0.2, mouse=True, scroll=False),
+    "fast": BehaviourProfile("fast", 0.0, (0, 0), 0.0, mouse=False, scroll=False, instant_fill=True),
+}
+
+# Profile used when neither the request nor BEHAVIOUR_PROFILE_<CARRIER> picks one
+DEFAULT_BEHAVIOUR_PROFILE = os.getenv("BEHAVIOUR_PROFILE", "stealth")
+
+_current = ContextVar("behaviour_profile", default=None)
+
+
+def profile_for(carrier: str, requested: str = None) -> BehaviourProfile:
+    """Per-request choice first, then the carrier's configured profile, then the default."""
+    for name in (requested, os.getenv(f"BEHAVIOUR_PROFILE_{carrier.upper()}"), DEFAULT_BEHAVIOUR_PROFILE):
+        if name and name.lower() in PROFILES:
+            return PROFILES[name.lower()]
+    return PROFILES["stealth"]
+
+
+def current_profile() -> BehaviourProfile:
+    return _current.get() or PROFILES["stealth"]
+
+
+@contextmanager
+def use_profile(profile: BehaviourProfile):
+    """Makes `profile` the one the helpers see for the wrapped driver run."""
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+class ProfileTimings:
+    """Driver run times per carrier and profile, to compare what each WAF tolerates."""
+
+    def __init__(self):
+        self._runs = {}   # (carrier, profile) -> [runs, successes, total_seconds]
+
+    def record(self, carrier: str, profile: str, seconds: float, ok: bool):
+        runs = self._runs.setdefault((carrier, profile), [0, 0, 0.0])
+        runs[0] += 1
+        runs[1] += 1 if ok else 0
+        runs[2] += seconds
+
+    def stats(self):
+        stats = {}
+        for (carrier, profile), (runs, successes, total) in self._runs.items():
+            stats.setdefault(carrier, {})[profile] = {
+                "runs": runs,
+                "success_rate": round(successes / runs, 3),
+                "avg_seconds": round(total / runs, 2),
+            }
+        return stats
+
+
+profile_timings = ProfileTimings()
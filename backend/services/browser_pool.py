@@ -0,0 +1,203 @@
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from services.utils import STEALTH_ARGS
+from services.display_pool import display_pool
+
+# Long-lived Chromium processes shared by every driver.
+# Drivers borrow a fresh, isolated context instead of launching a browser.
+BROWSER_MAX_CONTEXTS = int(os.getenv("BROWSER_MAX_CONTEXTS", "4"))
+BROWSER_MAX_PROCESSES = int(os.getenv("BROWSER_MAX_PROCESSES", "2"))
+BROWSER_CONTEXTS_PER_PROCESS = int(os.getenv("BROWSER_CONTEXTS_PER_PROCESS", "3"))
+# Headful processes share the Xvfb displays: by default one busy window per
+# process, and as many processes per profile as there are displays (never
+# more than the contexts that can be open at once)
+BROWSER_HEADFUL_CONTEXTS_PER_PROCESS = int(os.getenv("BROWSER_HEADFUL_CONTEXTS_PER_PROCESS", "1"))
+BROWSER_MAX_HEADFUL_PROCESSES = int(os.getenv(
+    "BROWSER_MAX_HEADFUL_PROCESSES",
+    str(max(BROWSER_MAX_PROCESSES, min(len(display_pool.displays), BROWSER_MAX_CONTEXTS)))
+))
+# Restart a process after this many contexts to shed leaked memory
+BROWSER_RECYCLE_AFTER = int(os.getenv("BROWSER_RECYCLE_AFTER", "200"))
+
+
+class PooledBrowser:
+    def __init__(self, browser, display=None):
+        self.browser = browser
+        self.display = display
+        self.active = 0
+        self.served = 0
+        self.retiring = False
+
+
+class BrowserPool:
+    """
+    Pool of Chromium processes grouped by launch profile (headless + args).
+    At most BROWSER_MAX_CONTEXTS contexts are open at once; further callers
+    queue until one is returned.
+    """
+
+    def __init__(self):
+        self._playwright = None
+        self._start_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(BROWSER_MAX_CONTEXTS)
+        self._profiles = {}   # (headless, args) -> list of PooledBrowser
+        self._launch_lock = asyncio.Lock()
+        self._leases = {}     # context -> (PooledBrowser, headless, args, use_slot)
+        self.launches = 0
+        self.contexts_served = 0
+        self.waiting = 0
+
+    # --- LIFECYCLE ---
+    async def start(self):
+        async with self._start_lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+
+    async def stop(self):
+        for browsers in self._profiles.values():
+            for pooled in browsers:
+                await self._close_browser(pooled)
+        self._profiles.clear()
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    # --- LEASING ---
+    async def _launch(self, headless: bool, args: tuple) -> PooledBrowser:
+        # Headful processes each get a display of their own from the Xvfb pool
+        display = None
+        if not headless:
+            display = display_pool.lease()
+            if display is None:
+                print("   ⚠️ Browser pool: no X display available, launching headless instead")
+                headless = True
+
+        try:
+            browser = await self._playwright.chromium.launch(
+                headless=headless,
+                args=list(args),
+                env={**os.environ, "DISPLAY": display} if display else None
+            )
+        except BaseException:
+            display_pool.release(display)
+            raise
+        self.launches += 1
+        on_display = f" on {display}" if display else ""
+        print(f"   🧭 Browser pool: launched Chromium (headless={headless}){on_display}, {self.launches} launches so far")
+        return PooledBrowser(browser, display)
+
+    async def _close_browser(self, pooled: PooledBrowser):
+        try:
+            await pooled.browser.close()
+        except Exception:
+            pass
+        display_pool.release(pooled.display)
+        pooled.display = None
+
+    async def _acquire_browser(self, headless: bool, args: tuple) -> PooledBrowser:
+        async with self._launch_lock:
+            browsers = self._profiles.setdefault((headless, args), [])
+            # Drop processes that crashed or were closed underneath us
+            for crashed in [b for b in browsers if not b.browser.is_connected()]:
+                browsers.remove(crashed)
+                display_pool.release(crashed.display)
+                crashed.display = None
+
+            if headless:
+                per_process, max_processes = BROWSER_CONTEXTS_PER_PROCESS, BROWSER_MAX_PROCESSES
+            else:
+                per_process, max_processes = BROWSER_HEADFUL_CONTEXTS_PER_PROCESS, BROWSER_MAX_HEADFUL_PROCESSES
+
+            candidates = [b for b in browsers if not b.retiring]
+            least_busy = min(candidates, key=lambda b: b.active, default=None)
+            if least_busy is None or (
+                least_busy.active >= per_process and len(candidates) < max_processes
+            ):
+                least_busy = await self._launch(headless, args)
+                browsers.append(least_busy)
+            least_busy.active += 1
+            return least_busy
+
+    async def _release_browser(self, pooled: PooledBrowser, headless: bool, args: tuple):
+        pooled.active -= 1
+        pooled.served += 1
+        if pooled.served >= BROWSER_RECYCLE_AFTER:
+            pooled.retiring = True
+        if pooled.retiring and pooled.active == 0:
+            browsers = self._profiles.get((headless, args), [])
+            if pooled in browsers:
+                browsers.remove(pooled)
+            await self._close_browser(pooled)
+
+    async def open_context(self, headless: bool = True, args=None, use_slot: bool = True, **context_options):
+        """
+        Opens a new isolated BrowserContext on a pooled browser.
+        With `use_slot`, waits for one of the BROWSER_MAX_CONTEXTS slots;
+        long-lived parked contexts (warm pages) pass use_slot=False.
+        Must be paired with close_context().
+        """
+        if self._playwright is None:
+            await self.start()
+        args = tuple(args if args is not None else STEALTH_ARGS)
+
+        if use_slot:
+            self.waiting += 1
+            try:
+                await self._slots.acquire()
+            finally:
+                self.waiting -= 1
+
+        pooled = None
+        try:
+            pooled = await self._acquire_browser(headless, args)
+            context = await pooled.browser.new_context(**context_options)
+        except BaseException:
+            if pooled is not None:
+                await self._release_browser(pooled, headless, args)
+            if use_slot:
+                self._slots.release()
+            raise
+
+        self.contexts_served += 1
+        self._leases[context] = (pooled, headless, args, use_slot)
+        return context
+
+    async def close_context(self, context):
+        lease = self._leases.pop(context, None)
+        try:
+            await context.close()
+        except Exception:
+            pass
+        if lease:
+            pooled, headless, args, use_slot = lease
+            await self._release_browser(pooled, headless, args)
+            if use_slot:
+                self._slots.release()
+
+    @asynccontextmanager
+    async def context(self, headless: bool = True, args=None, **context_options):
+        """
+        Borrows a new isolated BrowserContext from a pooled browser.
+        The context is closed (cookies, storage and pages discarded) on exit.
+        """
+        context = await self.open_context(headless, args, **context_options)
+        try:
+            yield context
+        finally:
+            await self.close_context(context)
+
+    def stats(self):
+        return {
+            "processes": sum(len(browsers) for browsers in self._profiles.values()),
+            "active_contexts": sum(b.active for browsers in self._profiles.values() for b in browsers),
+            "max_contexts": BROWSER_MAX_CONTEXTS,
+            "waiting": self.waiting,
+            "launches": self.launches,
+            "contexts_served": self.contexts_served,
+            **display_pool.stats(),
+        }
+
+
+browser_pool = BrowserPool()
@@ -0,0 +1,140 @@
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class CacheEntry:
+    __slots__ = ("value", "stored_at", "ttl")
+
+    def __init__(self, value, stored_at: float, ttl: float):
+        self.value = value
+        self.stored_at = stored_at
+        self.ttl = ttl
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    @property
+    def fresh(self) -> bool:
+        return self.age <= self.ttl
+
+
+class TTLCache:
+    """
+    In-memory LRU cache with per-entry TTLs and an optional SQLite disk tier.
+
+    Entries past their TTL are still returned (with `fresh == False`) until
+    `stale_window` seconds later, so callers can serve stale data while
+    refreshing. Values must be JSON-serialisable when a disk path is set.
+    """
+
+    def __init__(self, name: str, max_entries: int = 1000, stale_window: float = 0, disk_path: str = ""):
+        self.name = name
+        self.max_entries = max_entries
+        self.stale_window = stale_window
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, ttl REAL NOT NULL)"
+            )
+            # Drop whatever expired while we were down
+            self._db.execute(
+                "DELETE FROM cache WHERE stored_at + ttl + ? < ?", (stale_window, time.time())
+            )
+            self._db.commit()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(key) -> str:
+        return "|".join(key) if isinstance(key, tuple) else str(key)
+
+    def _expired(self, entry: CacheEntry) -> bool:
+        return entry.age > entry.ttl + self.stale_window
+
+    def get(self, key):
+        """Returns the CacheEntry for `key` (possibly stale) or None."""
+        key = self._key(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db:
+                row = self._db.execute(
+                    "SELECT value, stored_at, ttl FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    entry = CacheEntry(json.loads(row[0]), row[1], row[2])
+                    self._put(key, entry)
+
+            if entry is not None and self._expired(entry):
+                self._delete(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if entry.fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return entry
+
+    def set(self, key, value, ttl: float):
+        key = self._key(key)
+        entry = CacheEntry(value, time.time(), ttl)
+        with self._lock:
+            self._put(key, entry)
+            if self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, stored_at, ttl) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), entry.stored_at, entry.ttl)
+                )
+                self._db.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._delete(self._key(key))
+
+    def delete_prefix(self, prefix):
+        """Drops every entry whose key starts with `prefix` (a tuple prefix or string)."""
+        prefix = self._key(prefix) + ("|" if isinstance(prefix, tuple) else "")
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+            if self._db:
+                escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                self._db.execute("DELETE FROM cache WHERE key LIKE ? ESCAPE '\\'", (escaped + "%",))
+                self._db.commit()
+
+    def _put(self, key: str, entry: CacheEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        # LRU bound applies to memory only; the disk tier keeps everything until expiry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _delete(self, key: str):
+        self._entries.pop(key, None)
+        if self._db:
+            self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._db.commit()
+
+    def stats(self):
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+        }
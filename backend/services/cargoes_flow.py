@@ -1,7 +1,13 @@
 import os
 import json
+import time
+import random
+import asyncio
 import httpx
 from dotenv import load_dotenv
+from services.cache import TTLCache
+from services.http_client import get_client
+from services.resilience import TokenBucket, CircuitBreaker, CircuitOpenError, backoff_delay
 
 load_dotenv()
 
@@ -9,10 +15,129 @@ API_BASE_URL = "https://connect.cargoes.com/flow/api/public_tracking/v1/shipment
 API_KEY = os.getenv("CARGOES_FLOW_API_KEY", "").strip()
 ORG_TOKEN = os.getenv("CARGOES_FLOW_ORG_TOKEN", "").strip()
 
+# Negative cache: containers the API answered with an empty list.
+# Expiry is jittered so a batch of misses doesn't all retry at once.
+NEGATIVE_TTL = float(os.getenv("CARGOES_FLOW_NEGATIVE_TTL", "21600"))
+NEGATIVE_JITTER = float(os.getenv("CARGOES_FLOW_NEGATIVE_JITTER", "0.2"))
+NEGATIVE_MAX_ENTRIES = int(os.getenv("CARGOES_FLOW_NEGATIVE_MAX_ENTRIES", "10000"))
+
+negative_cache = TTLCache("Cargoes Flow negative", max_entries=NEGATIVE_MAX_ENTRIES)
+
+def _negative_ttl() -> float:
+    return NEGATIVE_TTL * random.uniform(1 - NEGATIVE_JITTER, 1 + NEGATIVE_JITTER)
+
+# Rate limit to our API quota, retry transient errors, and stop calling
+# altogether while the API is unhealthy.
+RATE_PER_SECOND = float(os.getenv("CARGOES_FLOW_RATE_PER_SECOND", "5"))
+RATE_BURST = int(os.getenv("CARGOES_FLOW_RATE_BURST", "10"))
+MAX_RETRIES = int(os.getenv("CARGOES_FLOW_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("CARGOES_FLOW_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("CARGOES_FLOW_BACKOFF_MAX", "8"))
+# No retry starts once a call has been going this long (seconds)
+CALL_DEADLINE = float(os.getenv("CARGOES_FLOW_CALL_DEADLINE", "30"))
+BREAKER_THRESHOLD = int(os.getenv("CARGOES_FLOW_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET = float(os.getenv("CARGOES_FLOW_BREAKER_RESET", "60"))
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+rate_limiter = TokenBucket(RATE_PER_SECOND, RATE_BURST)
+breaker = CircuitBreaker("Cargoes Flow", BREAKER_THRESHOLD, BREAKER_RESET)
+
+API_HEADERS = {
+    "X-DPW-ApiKey": API_KEY,
+    "X-DPW-Org-Token": ORG_TOKEN,
+    "Content-Type": "application/json",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+def extract_shipment(shipment: dict, clean_number: str) -> dict:
+    """
+    Deep extraction of one Cargoes Flow shipment into the compact
+    summary dict (origin, destination, eta_raw, latest_event, co2).
+    """
+    # --- DEEP EXTRACTION STRATEGY ---
+    shipment_legs = shipment.get("shipmentLegs", {})
+    legs = shipment_legs.get("portToPort", {}) if isinstance(shipment_legs, dict) else {}
+    
+    # 1. Hunt for the REAL ETA (It hides in different places)
+    eta = (
+        legs.get("destinationOceanPortEta") or 
+        legs.get("lastPortEta") or 
+        legs.get("dischargePortEta") or
+        shipment.get("promisedEta") or 
+        "N/A"
+    )
+
+    # 2. Hunt for the REAL Status
+    # Sometimes main status is just "ACTIVE", we want "Vessel Departure"
+    events = shipment.get("shipmentEvents", [])
+    latest_event = (events[0].get("name") if isinstance(events, list) and len(events) > 0 and isinstance(events[0], dict) else None) or shipment.get("subStatus1")
+
+    # 3. Format Emissions
+    co2_val = (shipment.get("emissions") or {}).get("co2e", {}).get("value")
+    co2 = f"{float(co2_val):.2f} kg" if co2_val else "N/A"
+
+    # 4. Construct a Clean Summary for the AI
+    # We pre-digest the data so the AI doesn't have to guess
+    return {
+        "container": clean_number,
+        "carrier": shipment.get("carrierScac"),
+        "origin": legs.get("firstPort"),
+        "destination": legs.get("lastPort"),
+        "eta_raw": eta,
+        "latest_event": latest_event,
+        "co2": co2
+    }
+
+async def api_get(params: dict):
+    """
+    Rate-limited GET against the shipments endpoint with jittered retries
+    on 429/5xx and connection errors, within CALL_DEADLINE. Timeouts are
+    not retried: a slow API stays slow, and the breaker should hear about
+    it at once. Every failed attempt counts towards the breaker. Raises
+    CircuitOpenError without touching the network while it is open.
+    """
+    if not breaker.allow():
+        raise CircuitOpenError("Cargoes Flow circuit is open")
+
+    client = get_client("cargoes_flow")
+    deadline = time.monotonic() + CALL_DEADLINE
+    response = None
+    for attempt in range(MAX_RETRIES + 1):
+        await rate_limiter.acquire()
+        try:
+            response = await client.get(API_BASE_URL, params=params, headers=API_HEADERS)
+        except httpx.TimeoutException:
+            breaker.record_failure()
+            raise
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            error, reason, retry_after = e, type(e).__name__, None
+        else:
+            if response.status_code not in RETRYABLE_STATUSES:
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            error, reason, retry_after = None, response.status_code, response.headers.get("Retry-After")
+
+        delay = backoff_delay(attempt, BACKOFF_BASE, BACKOFF_MAX, retry_after)
+        if attempt == MAX_RETRIES or breaker.state == breaker.OPEN or time.monotonic() + delay > deadline:
+            break
+        print(f"   🔁 API: {reason}, retrying ({attempt + 1}/{MAX_RETRIES})...")
+        await asyncio.sleep(delay)
+
+    if error:
+        raise error
+    return response
+
 async def check_cargoes_flow(tracking_number: str, carrier_type: str):
     if not API_KEY or not ORG_TOKEN: return None
 
     clean_number = tracking_number.replace(" ", "").replace("-", "")
+
+    if negative_cache.get((carrier_type, clean_number)):
+        print(f"   ⏭️ API: {clean_number} recently unknown to Cargoes Flow. Skipping.")
+        return None
+
     print(f"   ⚡ API: Checking Cargoes Flow for {clean_number}...")
 
     params = {
@@ -22,69 +147,43 @@ async def check_cargoes_flow(tracking_number: str, carrier_type: str):
         "_limit": "50"
     }
 
-    headers = {
-        "X-DPW-ApiKey": API_KEY,
-        "X-DPW-Org-Token": ORG_TOKEN,
-        "Content-Type": "application/json",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    }
-
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(API_BASE_URL, params=params, headers=headers, timeout=20.0)
-
-            if response.status_code == 200:
-                data = response.json()
-                if isinstance(data, list) and len(data) > 0:
-                    shipment = data[0]
-                    
-                    # --- DEEP EXTRACTION STRATEGY ---
-                    shipment_legs = shipment.get("shipmentLegs", {})
-                    legs = shipment_legs.get("portToPort", {}) if isinstance(shipment_legs, dict) else {}
-                    
-                    # 1. Hunt for the REAL ETA (It hides in different places)
-                    eta = (
-                        legs.get("destinationOceanPortEta") or 
-                        legs.get("lastPortEta") or 
-                        legs.get("dischargePortEta") or
-                        shipment.get("promisedEta") or 
-                        "N/A"
-                    )
-
-                    # 2. Hunt for the REAL Status
-                    # Sometimes main status is just "ACTIVE", we want "Vessel Departure"
-                    events = shipment.get("shipmentEvents", [])
-                    latest_event = (events[0].get("name") if isinstance(events, list) and len(events) > 0 and isinstance(events[0], dict) else None) or shipment.get("subStatus1")
-
-                    # 3. Format Emissions
-                    co2_val = shipment.get("emissions", {}).get("co2e", {}).get("value")
-                    co2 = f"{float(co2_val):.2f} kg" if co2_val else "N/A"
-
-                    # 4. Construct a Clean Summary for the AI
-                    # We pre-digest the data so the AI doesn't have to guess
-                    summary_data = {
-                        "container": clean_number,
-                        "carrier": shipment.get("carrierScac"),
-                        "origin": legs.get("firstPort"),
-                        "destination": legs.get("lastPort"),
-                        "eta_raw": eta,
-                        "latest_event": latest_event,
-                        "co2": co2
-                    }
-                    
-                    print(f"   ✅ API Success! Found ETA: {eta}")
-                    return json.dumps(summary_data, indent=2)
-                else:
-                    print("   🔸 API returned 200 but list is empty.")
-                    return None
+        response = await api_get(params)
+
+        if response.status_code == 200:
+            data = response.json()
+            if isinstance(data, list) and len(data) > 0:
+                summary_data = extract_shipment(data[0], clean_number)
+                print(f"   ✅ API Success! Found ETA: {summary_data['eta_raw']}")
+                return json.dumps(summary_data, indent=2)
             else:
-                print(f"   🔸 API Error {response.status_code}")
+                print("   🔸 API returned 200 but list is empty.")
+                negative_cache.set((carrier_type, clean_number), True, _negative_ttl())
                 return None
+        else:
+            print(f"   🔸 API Error {response.status_code}")
+            return None
 
+    except CircuitOpenError:
+        print("   ⛔ API: Cargoes Flow circuit open. Failing fast.")
+        return None
     except Exception as e:
         print(f"   ⚠️ API Connection Failed: {e}")
         return None
 
+def to_sea_shipment(data: dict) -> dict:
+    """Converts an extracted summary dict to the shipment dict format used by tracking."""
+    return {
+        "source": "Cargoes Flow API",
+        "container": data.get("container"),
+        "carrier": data.get("carrier") or "Unknown",
+        "eta": data.get("eta_raw", "N/A"),
+        "co2": data.get("co2", "N/A"),
+        "status": data.get("latest_event") or "Unknown",
+        "sub_status": data.get("latest_event", ""),
+        "raw_data": data
+    }
+
 # Backward compatibility wrapper
 async def get_sea_shipment(container_number: str):
     """
@@ -96,16 +195,7 @@ async def get_sea_shipment(container_number: str):
         try:
             data = json.loads(result)
             # Convert to expected dict format for main.py
-            return {
-                "source": "Cargoes Flow API",
-                "container": data.get("container"),
-                "carrier": data.get("carrier") or "Unknown",
-                "eta": data.get("eta_raw", "N/A"),
-                "co2": data.get("co2", "N/A"),
-                "status": data.get("latest_event") or "Unknown",
-                "sub_status": data.get("latest_event", ""),
-                "raw_data": data
-            }
+            return to_sea_shipment(data)
         except json.JSONDecodeError:
             return None
     return None
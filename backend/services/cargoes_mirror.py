@@ -0,0 +1,227 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+
+from services.cargoes_flow import API_KEY, ORG_TOKEN, api_get, extract_shipment
+
+MIRROR_ENABLED = os.getenv("CARGOES_MIRROR_ENABLED", "true").lower() == "true"
+MIRROR_DB_PATH = os.getenv("CARGOES_MIRROR_DB_PATH", "/tmp/cargoo_cargoes_mirror.db")
+MIRROR_SYNC_INTERVAL = float(os.getenv("CARGOES_MIRROR_SYNC_INTERVAL", "600"))
+MIRROR_PAGE_SIZE = int(os.getenv("CARGOES_MIRROR_PAGE_SIZE", "50"))
+# Query parameter used to ask only for shipments updated after our cursor.
+# ASSUMPTION: the public tracking API docs we have don't name this filter.
+# If the API ignores it, delta syncs return already-seen shipments; sync()
+# detects that, warns and reports "delta_ignored" in stats.
+MIRROR_DELTA_PARAM = os.getenv("CARGOES_MIRROR_DELTA_PARAM", "updatedAtFrom")
+# A full pass re-confirms every shipment, catching updates a delta missed
+MIRROR_FULL_SYNC_INTERVAL = float(os.getenv("CARGOES_MIRROR_FULL_SYNC_INTERVAL", "21600"))
+# Mirror entries not confirmed by a sync or webhook for this long are not
+# served; the live API answers instead
+MIRROR_MAX_AGE = float(os.getenv("CARGOES_MIRROR_MAX_AGE", "43200"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shipments (
+    container TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    updated_at TEXT,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class CargoesMirror:
+    """
+    Local copy of every Cargoes Flow shipment visible to our org token.
+    The first sync pages through everything; later syncs only ask for
+    shipments updated since the newest `updatedAt` seen, with a full pass
+    every MIRROR_FULL_SYNC_INTERVAL. Lookups are a dict read and skip
+    entries older than MIRROR_MAX_AGE; SQLite keeps the mirror (and
+    cursor) across restarts.
+    """
+
+    def __init__(self, db_path: str = MIRROR_DB_PATH):
+        self.db_path = db_path
+        self._db = None
+        self._lock = threading.Lock()
+        self._index = {}   # container -> (summary dict, synced_at)
+        self._task = None
+        self.cursor = None
+        self.last_full_sync = None
+        self.delta_ignored = False
+        self.expired_hits = 0
+        self.last_sync = None
+        self.last_sync_seconds = None
+        self.last_sync_count = 0
+
+    # --- LIFECYCLE ---
+    async def start(self):
+        if not MIRROR_ENABLED or not API_KEY or not ORG_TOKEN:
+            return
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+            self._db.commit()
+            for container, summary, synced_at in self._db.execute(
+                "SELECT container, summary, synced_at FROM shipments"
+            ):
+                self._index[container] = (json.loads(summary), synced_at)
+            row = self._db.execute("SELECT value FROM sync_state WHERE key = 'cursor'").fetchone()
+            self.cursor = row[0] if row else None
+            row = self._db.execute("SELECT value FROM sync_state WHERE key = 'last_full_sync'").fetchone()
+            self.last_full_sync = float(row[0]) if row else None
+        print(f"   🪞 Mirror: loaded {len(self._index)} Cargoes Flow shipments")
+        self._task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._db:
+            self._db.close()
+            self._db = None
+
+    # --- LOOKUP ---
+    def lookup(self, container: str):
+        """
+        Mirrored summary dict for a normalized container number, or None if
+        unknown or not confirmed within MIRROR_MAX_AGE.
+        """
+        entry = self._index.get(container)
+        if not entry:
+            return None
+        summary, synced_at = entry
+        if time.time() - synced_at > MIRROR_MAX_AGE:
+            self.expired_hits += 1
+            return None
+        return summary
+
+    def upsert(self, shipments):
+        """
+        Stores raw Cargoes Flow shipments (from a sync page or a webhook push).
+        Returns (number stored, newest updatedAt among them).
+        """
+        rows = []
+        newest = None
+        now = time.time()
+        for shipment in shipments:
+            container = (shipment.get("containerNumber") or "").replace(" ", "").replace("-", "").upper()
+            if not container:
+                continue
+            updated_at = shipment.get("updatedAt")
+            summary = extract_shipment(shipment, container)
+            self._index[container] = (summary, now)
+            rows.append((container, json.dumps(summary), updated_at, now))
+            if updated_at and (newest is None or updated_at > newest):
+                newest = updated_at
+        if self._db and rows:
+            with self._lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO shipments (container, summary, updated_at, synced_at) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._db.commit()
+        return len(rows), newest
+
+    # --- SYNC ---
+    async def _sync_loop(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"   ⚠️ Mirror: sync failed: {e}")
+            await asyncio.sleep(MIRROR_SYNC_INTERVAL)
+
+    async def sync(self):
+        started = time.time()
+        params = {
+            "shipmentType": "INTERMODAL_SHIPMENT",
+            "includeUniqueContainers": "true",
+            "_limit": str(MIRROR_PAGE_SIZE),
+        }
+        full = (
+            not self.cursor
+            or self.last_full_sync is None
+            or started - self.last_full_sync >= MIRROR_FULL_SYNC_INTERVAL
+        )
+        if not full:
+            params[MIRROR_DELTA_PARAM] = self.cursor
+
+        page = 1
+        count = 0
+        already_seen = 0
+        newest = self.cursor
+        while True:
+            response = await api_get({**params, "_page": str(page)})
+            if response.status_code != 200:
+                raise RuntimeError(f"API Error {response.status_code} on page {page}")
+            shipments = response.json()
+            if not isinstance(shipments, list) or not shipments:
+                break
+
+            if not full:
+                already_seen += sum(
+                    1 for s in shipments if s.get("updatedAt") and s["updatedAt"] < self.cursor
+                )
+            stored, page_newest = self.upsert(shipments)
+            count += stored
+            if page_newest and (newest is None or page_newest > newest):
+                newest = page_newest
+
+            if len(shipments) < MIRROR_PAGE_SIZE:
+                break
+            page += 1
+
+        if not full:
+            # Shipments older than the cursor mean the filter was ignored
+            # and this "delta" paged through the whole data set again
+            ignored = already_seen > 0
+            if ignored and not self.delta_ignored:
+                print(f"   ⚠️ Mirror: API ignored '{MIRROR_DELTA_PARAM}' ({already_seen} unchanged shipments "
+                      f"returned); delta syncs are full syncs. Check CARGOES_MIRROR_DELTA_PARAM.")
+            self.delta_ignored = ignored
+
+        # Only advance the cursor once the whole pass succeeded
+        if newest and newest != self.cursor:
+            self.cursor = newest
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('cursor', ?)", (newest,)
+                )
+                self._db.commit()
+        if full:
+            self.last_full_sync = started
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('last_full_sync', ?)", (str(started),)
+                )
+                self._db.commit()
+
+        self.last_sync = time.time()
+        self.last_sync_seconds = round(self.last_sync - started, 2)
+        self.last_sync_count = count
+        print(f"   🪞 Mirror: {'full' if full else 'delta'} sync of {count} shipments in {self.last_sync_seconds}s")
+
+    def stats(self):
+        return {
+            "enabled": self._task is not None,
+            "shipments": len(self._index),
+            "cursor": self.cursor,
+            "last_full_sync": self.last_full_sync,
+            "delta_ignored": self.delta_ignored,
+            "expired_hits": self.expired_hits,
+            "last_sync": self.last_sync,
+            "last_sync_seconds": self.last_sync_seconds,
+            "last_sync_count": self.last_sync_count,
+        }
+
+
+cargoes_mirror = CargoesMirror()
@@ -0,0 +1,55 @@
+import os
+import time
+
+from services.cargoes_flow import extract_shipment, to_sea_shipment
+from services.cargoes_mirror import cargoes_mirror
+from services.history import history
+from services.tracking import result_cache, normalize_container
+
+# If set, every verified payload is written here so it can be replayed later
+WEBHOOK_RECORD_DIR = os.getenv("CARGOES_FLOW_WEBHOOK_RECORD_DIR", "")
+
+
+def _shipments_from_payload(payload):
+    """Pushes arrive as one shipment, a list, or wrapped in `data` / `shipments`."""
+    if isinstance(payload, dict):
+        for wrapper in ("data", "shipments", "shipment"):
+            if wrapper in payload:
+                return _shipments_from_payload(payload[wrapper])
+        return [payload]
+    if isinstance(payload, list):
+        return [shipment for shipment in payload if isinstance(shipment, dict)]
+    return []
+
+
+def record_payload(body: bytes):
+    if not WEBHOOK_RECORD_DIR:
+        return
+    os.makedirs(WEBHOOK_RECORD_DIR, exist_ok=True)
+    path = os.path.join(WEBHOOK_RECORD_DIR, f"cargoes_webhook_{time.time():.6f}.json")
+    with open(path, "wb") as f:
+        f.write(body)
+
+
+def ingest(payload) -> list:
+    """
+    Applies a pushed shipment update: refreshes the mirror, records a
+    snapshot in the history store and drops cached lookups for the
+    container so the next request is answered from the new snapshot.
+    Returns the containers updated.
+    """
+    shipments = _shipments_from_payload(payload)
+    cargoes_mirror.upsert(shipments)
+
+    updated = []
+    for shipment in shipments:
+        container = normalize_container(shipment.get("containerNumber") or "")
+        if not container:
+            continue
+        summary = extract_shipment(shipment, container)
+        snapshot = {"tier": "cargoes_flow", "data": to_sea_shipment(summary)}
+        history.record(container, summary.get("carrier") or "Unknown", snapshot)
+        result_cache.delete_prefix((container,))
+        updated.append(container)
+        print(f"   📬 Webhook: {container} updated. ETA: {summary['eta_raw']}")
+    return updated
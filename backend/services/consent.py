@@ -0,0 +1,96 @@
+import json
+
+# Consent buttons clicked on any carrier site (OneTrust, Cookiebot, generic)
+CONSENT_SELECTORS = [
+    "#onetrust-accept-btn-handler",
+    "#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll",
+    "#CybotCookiebotDialogBodyButtonAccept",
+    ".cc-btn.cc-accept",
+]
+
+# Button labels (whole text, case-insensitive) that accept cookies
+CONSENT_TEXTS = [
+    "accept",
+    "accept all",
+    "accept all cookies",
+    "allow all",
+    "allow all cookies",
+    "i accept",
+    "i agree",
+    "agree",
+]
+
+BINDING_NAME = "__cargooConsentClicked"
+
+# Watches the DOM from document start and clicks the first visible consent
+# button as soon as it appears, then reports it through the exposed binding.
+CONSENT_SCRIPT = """
+(() => {
+    const SELECTORS = %(selectors)s;
+    const TEXTS = %(texts)s;
+    const clicked = new WeakSet();
+    const visible = (el) => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    const click = (el, what) => {
+        clicked.add(el);
+        el.click();
+        try { window.%(binding)s(what); } catch (e) {}
+    };
+    const sweep = () => {
+        for (const sel of SELECTORS) {
+            let el = null;
+            try { el = document.querySelector(sel); } catch (e) { continue; }
+            if (el && !clicked.has(el) && visible(el)) { click(el, sel); return; }
+        }
+        for (const el of document.querySelectorAll('button, [role="button"]')) {
+            const text = (el.innerText || '').trim().toLowerCase();
+            if (TEXTS.includes(text) && !clicked.has(el) && visible(el)) { click(el, 'text=' + text); return; }
+        }
+    };
+    let queued = false;
+    const schedule = () => {
+        if (queued) return;
+        queued = true;
+        setTimeout(() => { queued = false; sweep(); }, 50);
+    };
+    const start = () => {
+        new MutationObserver(schedule).observe(document.documentElement, {
+            childList: true, subtree: true, attributes: true, attributeFilter: ['style', 'class', 'hidden'],
+        });
+        schedule();
+    };
+    if (document.documentElement) start();
+    else document.addEventListener('DOMContentLoaded', start);
+})();
+"""
+
+
+class ConsentKiller:
+    """
+    Dismisses cookie/consent banners from inside the page instead of
+    probing selectors one by one from Python. Drivers never wait on banner
+    detection; clicks are reported back and counted per carrier.
+    """
+
+    def __init__(self):
+        self.clicks = {}   # carrier -> {selector: count}
+
+    async def install(self, context, carrier: str, extra_selectors=()):
+        """Adds the consent script (plus carrier-specific selectors) to `context`."""
+
+        def on_click(source, what):
+            per_carrier = self.clicks.setdefault(carrier, {})
+            per_carrier[what] = per_carrier.get(what, 0) + 1
+            print(f"   🍪 {carrier}: consent banner dismissed ({what})")
+
+        await context.expose_binding(BINDING_NAME, on_click)
+        await context.add_init_script(CONSENT_SCRIPT % {
+            "selectors": json.dumps(list(extra_selectors) + CONSENT_SELECTORS),
+            "texts": json.dumps(CONSENT_TEXTS),
+            "binding": BINDING_NAME,
+        })
+
+    def stats(self):
+        return {carrier: dict(clicks) for carrier, clicks in self.clicks.items()}
+
+
+consent_killer = ConsentKiller()
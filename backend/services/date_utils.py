@@ -1,3 +1,4 @@
+import re
 from datetime import datetime
 from dateutil import parser
 from typing import Optional, Tuple
@@ -17,8 +18,10 @@ def parse_date(date_string: str) -> Optional[datetime]:
         return None
     
     try:
-        # Use dateutil parser which handles most formats automatically
-        parsed_date = parser.parse(date_string, dayfirst=True)
+        # Use dateutil parser which handles most formats automatically.
+        # ISO dates are year-month-day; dayfirst would swap their day and month.
+        iso = re.match(r"\s*\d{4}-\d{1,2}-\d{1,2}", date_string) is not None
+        parsed_date = parser.parse(date_string, dayfirst=not iso)
         return parsed_date
     except (ValueError, TypeError, parser.ParserError):
         # If parsing fails, return None
@@ -0,0 +1,34 @@
+import os
+
+# Virtual X displays started by entrypoint.sh (comma separated, e.g. ":99,:100").
+# Falls back to the single DISPLAY when only one X server is running.
+XVFB_DISPLAY_LIST = os.getenv("XVFB_DISPLAY_LIST", os.getenv("DISPLAY", ""))
+
+
+class DisplayPool:
+    """
+    Hands each headful Chromium process its own X display, least-loaded
+    first, so headful browsers don't fight over one framebuffer and focus.
+    """
+
+    def __init__(self, displays: str):
+        self.displays = [d.strip() for d in displays.split(",") if d.strip()]
+        self._browsers = {display: 0 for display in self.displays}
+
+    def lease(self):
+        """Returns the display with the fewest browsers, or None if there is no X server."""
+        if not self.displays:
+            return None
+        display = min(self.displays, key=self._browsers.get)
+        self._browsers[display] += 1
+        return display
+
+    def release(self, display):
+        if display in self._browsers:
+            self._browsers[display] = max(0, self._browsers[display] - 1)
+
+    def stats(self):
+        return {"displays": len(self.displays), "browsers_per_display": dict(self._browsers)}
+
+
+display_pool = DisplayPool(XVFB_DISPLAY_LIST)
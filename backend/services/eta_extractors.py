@@ -0,0 +1,260 @@
+import os
+import re
+from datetime import datetime
+
+# Extractions at or above this confidence skip the LLM entirely
+EXTRACTOR_MIN_CONFIDENCE = float(os.getenv("EXTRACTOR_MIN_CONFIDENCE", "0.8"))
+
+_MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+_MON = "(" + "|".join(_MONTHS) + ")[a-z]*"
+
+# (pattern, order of the captured groups). Carrier sites are day-first.
+DATE_PATTERNS = [
+    (re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})"), "ymd"),
+    (re.compile(r"\b(\d{1,2})[/.](\d{1,2})[/.](\d{4})\b"), "dmy"),
+    (re.compile(r"\b(\d{1,2})[-\s]" + _MON + r"[-\s,]+(\d{4})\b", re.IGNORECASE), "dMy"),
+    (re.compile(r"\b" + _MON + r"[-\s](\d{1,2})[-\s,]+(\d{4})\b", re.IGNORECASE), "Mdy"),
+]
+
+NOT_FOUND = re.compile(r"no information|not found|no results|invalid (container|number)", re.IGNORECASE)
+DELIVERED = re.compile(r"\bdelivered\b", re.IGNORECASE)
+STATUS_LINE = re.compile(r"\bstatus\b", re.IGNORECASE)
+
+# Extra confidence when a second, different label points at the same date.
+# Generic labels ("ETA", "Arrival") sit below EXTRACTOR_MIN_CONFIDENCE and
+# only skip the LLM with this corroboration.
+CORROBORATION_BONUS = 0.1
+
+# How far (in characters) a date may sit from its label on the same line
+LABEL_REACH = 80
+
+
+def _to_date(match, order):
+    groups = match.groups()
+    try:
+        if order == "ymd":
+            return datetime(int(groups[0]), int(groups[1]), int(groups[2]))
+        if order == "dmy":
+            return datetime(int(groups[2]), int(groups[1]), int(groups[0]))
+        if order == "dMy":
+            return datetime(int(groups[2]), _MONTHS.index(groups[1][:3].lower()) + 1, int(groups[0]))
+        return datetime(int(groups[2]), _MONTHS.index(groups[0][:3].lower()) + 1, int(groups[1]))
+    except ValueError:
+        return None
+
+
+def find_dates(text: str):
+    """All dates in `text` as (start, end, datetime), in order of appearance."""
+    found = []
+    for pattern, order in DATE_PATTERNS:
+        for match in pattern.finditer(text):
+            date = _to_date(match, order)
+            if date and 2000 <= date.year <= 2100:
+                found.append((match.start(), match.end(), date))
+    found.sort(key=lambda item: item[0])
+    return found
+
+
+class CarrierExtractor:
+    """
+    Rule-based ETA extraction for one carrier's driver output.
+
+    `labels` are (compiled pattern, confidence) pairs: text that introduces
+    the destination ETA on that carrier's page. A labelled date is taken
+    from the same line (the first date after the label, else the closest
+    one before it, which covers "date | place | event" table rows) or from
+    the next lines when the page puts values under their headings.
+    When several dates share the strongest label, the latest wins: earlier
+    ones are transshipment arrivals. A date that a second, different label
+    also points at gains CORROBORATION_BONUS.
+    """
+
+    def __init__(self, name: str, labels):
+        self.name = name
+        self.labels = labels
+
+    def _candidates(self, lines):
+        """(date, confidence, label index, label position) for every labelled date."""
+        candidates = []
+        for i, line in enumerate(lines):
+            for index, (pattern, confidence) in enumerate(self.labels):
+                for label in pattern.finditer(line):
+                    where = (i, label.start(), label.end())
+                    dates = find_dates(line)
+                    after = [d for start, _, d in dates if label.end() <= start <= label.end() + LABEL_REACH]
+                    before = [d for _, end, d in dates if label.start() - LABEL_REACH <= end <= label.start()]
+                    if after:
+                        candidates.append((after[0], confidence, index, where))
+                    elif before:
+                        candidates.append((before[-1], confidence, index, where))
+                    else:
+                        for following in lines[i + 1:i + 3]:
+                            below = find_dates(following)
+                            if below:
+                                # Values under a heading are a weaker signal
+                                candidates.append((below[0][2], confidence - 0.1, index, where))
+                                break
+        return candidates
+
+    @staticmethod
+    def _corroborated(eta, candidates):
+        """Two different labels on separate lines give the same date."""
+        found = {(index, where[0]) for date, _, index, where in candidates if date == eta}
+        return any(
+            index != other and line != other_line
+            for index, line in found for other, other_line in found
+        )
+
+    @staticmethod
+    def _delivered(lines):
+        """
+        "Delivered" in an event row (a line with a date, or a vertical table
+        cell just below/above a cell holding only a date) or in a status
+        line, not in navigation or FAQ text.
+        """
+        def date_cell(line):
+            dates = find_dates(line)
+            return len(dates) == 1 and len(line) - (dates[0][1] - dates[0][0]) <= 6
+
+        for i, line in enumerate(lines):
+            if not DELIVERED.search(line):
+                continue
+            if STATUS_LINE.search(line) or find_dates(line):
+                return True
+            if any(date_cell(nearby) for nearby in lines[max(0, i - 2):i] + lines[i + 1:i + 2]):
+                return True
+        return False
+
+    def extract(self, text: str, today: datetime = None):
+        """Returns {latest_date, status, summary, co2, confidence, extractor}."""
+        today = today or datetime.now()
+        result = {
+            "latest_date": "N/A",
+            "status": "Unknown",
+            "summary": "No ETA found.",
+            "co2": "N/A",
+            "confidence": 0.0,
+            "extractor": self.name,
+        }
+        lines = [line.strip() for line in text.splitlines()]
+        lines = [line for line in lines if line]
+        candidates = self._candidates(lines)
+        if not candidates:
+            if NOT_FOUND.search(text):
+                result["status"] = "Not Found"
+            return result
+
+        best = max(confidence for _, confidence, _, _ in candidates)
+        top = [date for date, confidence, _, _ in candidates if confidence == best]
+        eta = max(top)
+        confidence = best
+        if len(set(top)) > 1:
+            confidence -= 0.1
+        elif len(top) > 1:
+            confidence += 0.05
+        if self._corroborated(eta, candidates):
+            confidence += CORROBORATION_BONUS
+
+        eta_text = eta.strftime("%d-%b-%Y")
+        if self._delivered(lines):
+            status, summary = "Delivered", f"Delivered. ETA was {eta_text}."
+        elif eta.date() > today.date():
+            status, summary = "In Transit", f"In Transit. ETA: {eta_text}."
+        else:
+            status, summary = "Arrived", f"Arrived on {eta_text}."
+
+        result.update({
+            "latest_date": eta_text,
+            "status": status,
+            "summary": summary,
+            "confidence": round(min(confidence, 0.99), 2),
+        })
+        return result
+
+
+def _labels(*pairs):
+    return [(re.compile(pattern, re.IGNORECASE), confidence) for pattern, confidence in pairs]
+
+
+EXTRACTORS = {
+    # Rendered tracker ("POD ETA" box, event rows) and TrackingInfo JSON ("PodEtaDate")
+    "msc": CarrierExtractor("msc", _labels(
+        (r"(final\s*)?pod\s*eta", 0.95),
+        (r"estimated\s+time\s+of\s+arrival", 0.85),
+        (r"\beta\b", 0.7),
+    )),
+    # Status table: "Vessel arrival | ANTWERP | 2026-01-18 | ..."; the last row is the final port
+    "hapag": CarrierExtractor("hapag", _labels(
+        (r"vessel\s+arrival", 0.9),
+        (r"\beta\b", 0.7),
+        (r"\barrival\b", 0.7),
+    )),
+    "hmm": CarrierExtractor("hmm", _labels(
+        (r"arrival\s*\(\s*eta\s*\)", 0.9),
+        (r"\beta\b", 0.7),
+        (r"\barrival\b", 0.7),
+    )),
+    # ShipmentLink: "Estimated Date of Arrival : JAN-18-2026"
+    "evergreen": CarrierExtractor("evergreen", _labels(
+        (r"estimated\s+(date|time)\s+of\s+arrival", 0.95),
+        (r"\beta\b", 0.7),
+        (r"arrival\s+date", 0.8),
+    )),
+    "cma": CarrierExtractor("cma", _labels(
+        (r"estimated\s+time\s+of\s+arrival", 0.9),
+        (r"\beta\b", 0.7),
+        (r"\barrival\b", 0.7),
+    )),
+}
+
+
+def extractor_for(carrier: str):
+    """Same carrier routing as the drivers in services/tracking.py."""
+    carrier_name = (carrier or "").lower()
+    if "msc" in carrier_name:
+        return EXTRACTORS["msc"]
+    if "hapag" in carrier_name:
+        return EXTRACTORS["hapag"]
+    if "cma" in carrier_name:
+        return EXTRACTORS["cma"]
+    if "hmm" in carrier_name or "hyundai" in carrier_name:
+        return EXTRACTORS["hmm"]
+    if "evergreen" in carrier_name or "ever" in carrier_name:
+        return EXTRACTORS["evergreen"]
+    return None
+
+
+class ExtractorStats:
+    def __init__(self):
+        self._counts = {}   # carrier -> [confident, fallback]
+
+    def record(self, carrier: str, confident: bool):
+        counts = self._counts.setdefault(carrier, [0, 0])
+        counts[0 if confident else 1] += 1
+
+    def stats(self):
+        return {
+            carrier: {
+                "confident": confident,
+                "llm_fallbacks": fallback,
+                "coverage": round(confident / (confident + fallback), 3),
+            }
+            for carrier, (confident, fallback) in self._counts.items()
+        }
+
+
+extractor_stats = ExtractorStats()
+
+
+def extract_eta(raw_text: str, carrier: str):
+    """
+    Runs the carrier's extractor. Returns its result when confident enough
+    to skip the LLM, otherwise None.
+    """
+    extractor = extractor_for(carrier)
+    if extractor is None:
+        return None
+    result = extractor.extract(raw_text)
+    confident = result["confidence"] >= EXTRACTOR_MIN_CONFIDENCE
+    extractor_stats.record(extractor.name, confident)
+    return result if confident else None
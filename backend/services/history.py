@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+from services.date_utils import standardize_date
+
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", "/tmp/cargoo_history.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    container TEXT NOT NULL,
+    carrier TEXT NOT NULL,
+    observed_at REAL NOT NULL,
+    eta TEXT NOT NULL,
+    status TEXT,
+    co2 TEXT,
+    source TEXT NOT NULL,
+    raw_hash TEXT NOT NULL,
+    snapshot TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_container_time ON snapshots (container, observed_at);
+CREATE INDEX IF NOT EXISTS idx_snapshots_time ON snapshots (observed_at);
+"""
+
+
+def summarize_snapshot(snapshot: dict) -> dict:
+    """Pulls the normalized ETA, status, CO2 and raw-text hash out of a lookup snapshot."""
+    if snapshot["tier"] == "cargoes_flow":
+        data = snapshot["data"]
+        raw = json.dumps(data.get("raw_data"), sort_keys=True)
+        eta, status, co2 = data.get("eta", "N/A"), data.get("status"), data.get("co2", "N/A")
+    else:
+        ai_result = snapshot["ai_result"]
+        raw = snapshot["scrape_data"].get("raw_data", "")
+        eta, status, co2 = ai_result.get("latest_date", "N/A"), ai_result.get("status"), ai_result.get("co2", "N/A")
+
+    return {
+        "eta": standardize_date(eta),
+        "status": status,
+        "co2": co2,
+        "source": snapshot["tier"],
+        "raw_hash": hashlib.sha256(str(raw).encode("utf-8")).hexdigest(),
+    }
+
+
+class ShipmentHistory:
+    """
+    Append-only store of every tracking snapshot (SQLite in WAL mode).
+    The (container, observed_at) index keeps "latest state" and
+    "ETA history" queries to an index seek plus a range scan.
+    """
+
+    def __init__(self, db_path: str = HISTORY_DB_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    def record(self, container: str, carrier: str, snapshot: dict):
+        summary = summarize_snapshot(snapshot)
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO snapshots (container, carrier, observed_at, eta, status, co2, source, raw_hash, snapshot) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (container, carrier, time.time(), summary["eta"], summary["status"], summary["co2"],
+                 summary["source"], summary["raw_hash"], json.dumps(snapshot))
+            )
+            self._db.commit()
+
+    def latest(self, container: str):
+        """Latest known snapshot for a container, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM snapshots WHERE container = ? ORDER BY observed_at DESC LIMIT 1",
+                (container,)
+            ).fetchone()
+        return self._row_dict(row, with_snapshot=True) if row else None
+
+    def changes(self, container: str, since: float = 0):
+        """
+        Snapshot diff for a container: every observation whose ETA or status
+        differs from the one before it, oldest first.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM snapshots WHERE container = ? AND observed_at >= ? ORDER BY observed_at",
+                (container, since)
+            ).fetchall()
+
+        changes = []
+        previous = None
+        for row in rows:
+            if previous is None or row["eta"] != previous["eta"] or row["status"] != previous["status"]:
+                change = self._row_dict(row)
+                change["previous_eta"] = previous["eta"] if previous else None
+                change["previous_status"] = previous["status"] if previous else None
+                changes.append(change)
+            previous = row
+        return changes
+
+    @staticmethod
+    def _row_dict(row, with_snapshot: bool = False):
+        result = {
+            "container": row["container"],
+            "carrier": row["carrier"],
+            "observed_at": row["observed_at"],
+            "eta": row["eta"],
+            "status": row["status"],
+            "co2": row["co2"],
+            "source": row["source"],
+            "raw_hash": row["raw_hash"],
+        }
+        if with_snapshot:
+            result["snapshot"] = json.loads(row["snapshot"])
+        return result
+
+
+history = ShipmentHistory()
@@ -0,0 +1,83 @@
+import os
+import httpx
+
+# Shared HTTP clients, one per service, reused across requests so batch runs
+# keep warm (HTTP/2, keep-alive) connections instead of paying DNS+TCP+TLS per call.
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "20"))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "10"))
+
+
+class CountingClient(httpx.AsyncClient):
+    """
+    AsyncClient that counts requests so pool usage can be reported.
+    Counting happens in send() rather than in a custom transport, so httpx
+    still builds its default transport and the HTTP(S)_PROXY / NO_PROXY mounts.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests_total = 0
+        self.http2_requests = 0
+        self.in_flight = 0
+
+    async def send(self, request, **kwargs):
+        self.requests_total += 1
+        self.in_flight += 1
+        try:
+            response = await super().send(request, **kwargs)
+        finally:
+            self.in_flight -= 1
+        if response.http_version == "HTTP/2":
+            self.http2_requests += 1
+        return response
+
+    def stats(self):
+        return {
+            "requests_total": self.requests_total,
+            "http2_requests": self.http2_requests,
+            "in_flight": self.in_flight,
+            "max_connections": HTTP_MAX_CONNECTIONS,
+            "max_keepalive": HTTP_MAX_KEEPALIVE,
+        }
+
+
+_clients = {}
+
+
+def get_client(name: str = "default") -> httpx.AsyncClient:
+    """
+    Returns the shared AsyncClient for `name`, creating it on first use.
+    Clients are closed by close_clients() from the FastAPI lifespan.
+    """
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = CountingClient(
+            http2=HTTP2_ENABLED,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                HTTP_READ_TIMEOUT,
+                connect=HTTP_CONNECT_TIMEOUT,
+                pool=HTTP_POOL_TIMEOUT,
+            ),
+        )
+        _clients[name] = client
+    return client
+
+
+async def close_clients():
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
+
+
+def pool_stats():
+    return {name: client.stats() for name, client in _clients.items()}
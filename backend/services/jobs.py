@@ -0,0 +1,286 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+
+from services.tracking import track_container
+from services.batch_parser import batching
+
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "/tmp/cargoo_jobs.db")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+
+# Item states. "running" items found at startup were interrupted by a restart.
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    cancelled INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    number TEXT NOT NULL,
+    carrier TEXT NOT NULL,
+    system_eta TEXT NOT NULL,
+    profile TEXT,
+    status TEXT NOT NULL,
+    result TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS idx_job_items_status ON job_items (status);
+CREATE INDEX IF NOT EXISTS idx_job_items_job_status ON job_items (job_id, status);
+"""
+
+
+class JobManager:
+    """
+    Background job queue for tracking runs.
+    Job state lives in SQLite so unfinished containers survive a restart;
+    a fixed pool of asyncio workers drains the queue.
+    """
+
+    def __init__(self, db_path: str = JOBS_DB_PATH, workers: int = JOB_WORKERS):
+        self.db_path = db_path
+        self.worker_count = workers
+        self._db = None
+        self._lock = threading.Lock()
+        self._queue = None
+        self._workers = []
+        self._running = {}     # (job_id, idx) -> asyncio.Task
+        self._listeners = {}   # job_id -> set of asyncio.Queue
+        self._stopping = False
+
+    # --- LIFECYCLE ---
+    async def start(self):
+        self._stopping = False
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+            self._db.commit()
+
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+        # Resume anything a previous process didn't finish
+        resumed = self._resume()
+        if resumed:
+            print(f"   🔁 Jobs: resumed {resumed} unfinished containers")
+
+    async def stop(self):
+        self._stopping = True
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._db:
+            self._db.close()
+            self._db = None
+
+    def _resume(self) -> int:
+        with self._lock:
+            self._db.execute(
+                "UPDATE job_items SET status = ? WHERE status = ?", (PENDING, RUNNING)
+            )
+            self._db.commit()
+            rows = self._db.execute(
+                "SELECT job_id, idx FROM job_items WHERE status = ? ORDER BY rowid", (PENDING,)
+            ).fetchall()
+        for row in rows:
+            self._queue.put_nowait((row["job_id"], row["idx"]))
+        return len(rows)
+
+    # --- PUBLIC API ---
+    def submit(self, containers) -> str:
+        """Queues a job. `containers` is a list of (number, carrier, system_eta, profile)."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT INTO jobs (id, created_at) VALUES (?, ?)", (job_id, now))
+            self._db.executemany(
+                "INSERT INTO job_items (job_id, idx, number, carrier, system_eta, profile, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(job_id, i, number, carrier, system_eta, profile, PENDING, now)
+                 for i, (number, carrier, system_eta, profile) in enumerate(containers)]
+            )
+            self._db.commit()
+        for i in range(len(containers)):
+            self._queue.put_nowait((job_id, i))
+        print(f"   📥 Jobs: queued job {job_id} with {len(containers)} containers")
+        return job_id
+
+    def get(self, job_id: str):
+        """Returns job progress and per-container results, or None if unknown."""
+        with self._lock:
+            job = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if not job:
+                return None
+            items = self._db.execute(
+                "SELECT * FROM job_items WHERE job_id = ? ORDER BY idx", (job_id,)
+            ).fetchall()
+
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+        for item in items:
+            counts[item["status"]] += 1
+        finished = counts[DONE] + counts[FAILED] + counts[CANCELLED]
+
+        if job["cancelled"]:
+            status = "cancelled"
+        elif finished == len(items):
+            status = "completed"
+        elif counts[RUNNING] or finished:
+            status = "running"
+        else:
+            status = "queued"
+
+        return {
+            "job_id": job_id,
+            "status": status,
+            "total": len(items),
+            "completed": finished,
+            "counts": counts,
+            "created_at": job["created_at"],
+            "items": [self._item_dict(item) for item in items],
+        }
+
+    def cancel(self, job_id: str):
+        """
+        Cancels pending and running containers of a job. Returns None for an
+        unknown job and False when nothing was left to cancel (the job has
+        finished, or was already cancelled).
+        """
+        with self._lock:
+            job = self._db.execute("SELECT cancelled FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if not job:
+                return None
+            active = self._db.execute(
+                "SELECT COUNT(*) FROM job_items WHERE job_id = ? AND status IN (?, ?)",
+                (job_id, PENDING, RUNNING)
+            ).fetchone()[0]
+            if job["cancelled"] or not active:
+                return False
+            self._db.execute("UPDATE jobs SET cancelled = 1 WHERE id = ?", (job_id,))
+            self._db.execute(
+                "UPDATE job_items SET status = ?, updated_at = ? WHERE job_id = ? AND status IN (?, ?)",
+                (CANCELLED, time.time(), job_id, PENDING, RUNNING)
+            )
+            self._db.commit()
+
+        for (running_job, _), task in list(self._running.items()):
+            if running_job == job_id:
+                task.cancel()
+        self._notify(job_id, {"event": "cancelled"})
+        print(f"   🛑 Jobs: cancelled job {job_id}")
+        return True
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        self._listeners.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        listeners = self._listeners.get(job_id)
+        if listeners:
+            listeners.discard(queue)
+            if not listeners:
+                del self._listeners[job_id]
+
+    # --- INTERNALS ---
+    @staticmethod
+    def _item_dict(item):
+        return {
+            "index": item["idx"],
+            "number": item["number"],
+            "carrier": item["carrier"],
+            "status": item["status"],
+            "result": json.loads(item["result"]) if item["result"] else None,
+        }
+
+    def _completed(self, job_id: str) -> bool:
+        """True once no item of a (not cancelled) job is pending or running."""
+        with self._lock:
+            job = self._db.execute("SELECT cancelled FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if not job or job["cancelled"]:
+                return False
+            active = self._db.execute(
+                "SELECT 1 FROM job_items WHERE job_id = ? AND status IN (?, ?) LIMIT 1",
+                (job_id, PENDING, RUNNING)
+            ).fetchone()
+        return active is None
+
+    def _notify(self, job_id: str, event: dict):
+        for queue in self._listeners.get(job_id, ()):
+            queue.put_nowait(event)
+
+    def _set_item(self, job_id: str, idx: int, status: str, result=None, only_if=None):
+        """Updates an item; with `only_if`, only when it is still in that state."""
+        query = "UPDATE job_items SET status = ?, result = ?, updated_at = ? WHERE job_id = ? AND idx = ?"
+        params = [status, json.dumps(result) if result is not None else None, time.time(), job_id, idx]
+        if only_if:
+            query += " AND status = ?"
+            params.append(only_if)
+        with self._lock:
+            updated = self._db.execute(query, params).rowcount
+            self._db.commit()
+        if updated:
+            self._notify(job_id, {"event": "item", "index": idx, "status": status, "result": result})
+        return bool(updated)
+
+    async def _worker(self):
+        while True:
+            job_id, idx = await self._queue.get()
+            try:
+                await self._run_item(job_id, idx)
+            except Exception as e:
+                print(f"   ❌ Jobs: worker error on {job_id}#{idx}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_item(self, job_id: str, idx: int):
+        with self._lock:
+            item = self._db.execute(
+                "SELECT * FROM job_items WHERE job_id = ? AND idx = ?", (job_id, idx)
+            ).fetchone()
+        # Cancelled (or already handled) while waiting in the queue
+        if not item or item["status"] != PENDING:
+            return
+        if not self._set_item(job_id, idx, RUNNING, only_if=PENDING):
+            return
+
+        # The task copies this context, so its AI parses can be batched
+        with batching():
+            task = asyncio.create_task(
+                track_container(item["number"], item["carrier"], item["system_eta"], item["profile"])
+            )
+        self._running[(job_id, idx)] = task
+        try:
+            result = await task
+            self._set_item(job_id, idx, DONE, result, only_if=RUNNING)
+        except asyncio.CancelledError:
+            # On shutdown the item stays "running" and is resumed on next start
+            if self._stopping:
+                raise
+            # Otherwise the job was cancelled and cancel() already marked the item
+            return
+        except Exception as e:
+            print(f"   ❌ Jobs: {item['number']} failed: {e}")
+            self._set_item(job_id, idx, FAILED, {"status": "Error", "message": str(e)}, only_if=RUNNING)
+        finally:
+            self._running.pop((job_id, idx), None)
+
+        if self._completed(job_id):
+            self._notify(job_id, {"event": "completed"})
+
+
+job_manager = JobManager()
@@ -0,0 +1,275 @@
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from services.browser_pool import browser_pool
+from services.storage_state import storage_states, looks_blocked
+from services.resource_policy import policy_for, apply_policy, BlockCounter
+from services.consent import consent_killer
+from services.selector_race import selector_cache
+
+# Pages older than this are re-prepared before being handed out
+PAGE_POOL_MAX_IDLE = float(os.getenv("PAGE_POOL_MAX_IDLE", "600"))
+
+
+class CarrierPages:
+    """
+    How to open and warm a page for one carrier.
+
+    `prepare(page)` navigates to the tracking form and leaves it ready for
+    typing (input visible). Consent banners are dismissed in the page by
+    services/consent.py; `consent_selectors` adds carrier-specific buttons.
+    `setup_context(context)` runs once per new context, e.g. to add init scripts.
+    Requests are filtered by the carrier's resource policy (see
+    services/resource_policy.py) unless it opts out.
+    """
+
+    def __init__(self, name: str, prepare, headless: bool = True, args=None,
+                 setup_context=None, default_size: int = 1, block_resources: bool = True,
+                 consent_selectors=(), **context_options):
+        self.name = name
+        self.prepare = prepare
+        # HEADLESS_<CARRIER>=true/false overrides whether the carrier runs headful
+        self.headless = os.getenv(f"HEADLESS_{name.upper()}", str(headless)).lower() == "true"
+        self.args = args
+        self.setup_context = setup_context
+        self.consent_selectors = tuple(consent_selectors)
+        self.context_options = context_options
+        self.size = int(os.getenv(f"PAGE_POOL_{name.upper()}", str(default_size)))
+        self.policy = policy_for(name, block_resources)
+
+
+class WarmPage:
+    def __init__(self, context, page=None):
+        self.context = context
+        self.page = page
+        # Requests blocked by the resource policy during the current lease
+        self.savings = BlockCounter()
+        self.parked_at = time.time()
+        self.prepared = False
+        self.blocked = False
+
+
+class PagePool:
+    """
+    Per-carrier pool of pages already parked on the tracking form.
+    A lookup leases a warm page and starts at "type the number"; afterwards
+    the page is re-prepared in the background and goes back to the pool.
+    With no warm page available (or pool size 0) a one-off page is opened
+    and prepared when the driver calls ready().
+    """
+
+    def __init__(self):
+        self._carriers = {}   # name -> CarrierPages
+        self._idle = {}       # name -> list of WarmPage
+        self._warming = {}    # name -> number of warm-ups in progress
+        self._leased = {}     # page -> (CarrierPages, WarmPage)
+        self._tasks = set()
+        self.warm_hits = 0
+        self.cold_starts = 0
+        self._savings = {}    # name -> totals of blocked requests over lookups
+
+    def register(self, carrier: CarrierPages):
+        self._carriers[carrier.name] = carrier
+        self._idle.setdefault(carrier.name, [])
+        self._warming.setdefault(carrier.name, 0)
+        self._savings.setdefault(carrier.name, {"lookups": 0, "blocked_requests": 0, "estimated_bytes_saved": 0})
+
+    # --- LIFECYCLE ---
+    async def start(self):
+        for name in self._carriers:
+            self._top_up(name)
+
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for pages in self._idle.values():
+            for warm in pages:
+                await browser_pool.close_context(warm.context)
+            pages.clear()
+
+    # --- INTERNALS ---
+    # `_warming` counts pages being prepared, both new and recycled, so
+    # _top_up never opens more pages than the configured size.
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _top_up(self, name: str):
+        carrier = self._carriers[name]
+        missing = carrier.size - len(self._idle[name]) - self._warming[name]
+        for _ in range(max(0, missing)):
+            self._warming[name] += 1
+            self._spawn(self._warm_new(carrier))
+
+    async def _open(self, carrier: CarrierPages, use_slot: bool):
+        options = dict(carrier.context_options)
+        state = storage_states.load(carrier.name)
+        if state:
+            options["storage_state"] = state
+        context = await browser_pool.open_context(
+            carrier.headless, carrier.args, use_slot=use_slot, **options
+        )
+        warm = WarmPage(context)
+        try:
+            await consent_killer.install(context, carrier.name, carrier.consent_selectors)
+            if carrier.setup_context:
+                await carrier.setup_context(context)
+            if carrier.policy:
+                await apply_policy(context, carrier.policy, lambda: warm.savings)
+            warm.page = await context.new_page()
+        except BaseException:
+            await browser_pool.close_context(context)
+            raise
+        return warm
+
+    def _record_savings(self, name: str, savings: BlockCounter):
+        totals = self._savings[name]
+        totals["lookups"] += 1
+        totals["blocked_requests"] += savings.requests
+        totals["estimated_bytes_saved"] += savings.bytes
+        if savings.requests:
+            print(f"   🚫 {name}: blocked {savings.requests} requests (~{savings.bytes // 1024} KB saved)")
+
+    async def _prepare(self, carrier: CarrierPages, warm: WarmPage):
+        try:
+            await carrier.prepare(warm.page)
+        except Exception:
+            await self._check_blocked(carrier, warm)
+            raise
+
+    async def _check_blocked(self, carrier: CarrierPages, warm: WarmPage):
+        try:
+            content = await warm.page.content()
+        except Exception:
+            return
+        if looks_blocked(content):
+            self._mark_blocked(carrier, warm)
+
+    def _mark_blocked(self, carrier: CarrierPages, warm: WarmPage):
+        # The session's cookies are suspect: never reuse them or this context
+        warm.blocked = True
+        storage_states.invalidate(carrier.name, "block detected")
+
+    async def _warm_new(self, carrier: CarrierPages):
+        warm = None
+        try:
+            # Parked pages sit outside the per-lookup context slots
+            warm = await self._open(carrier, use_slot=False)
+            await self._prepare(carrier, warm)
+            warm.parked_at = time.time()
+            self._idle[carrier.name].append(warm)
+            print(f"   🔥 Page pool: warm {carrier.name} page ready")
+        except Exception as e:
+            print(f"   ⚠️ Page pool: could not warm {carrier.name} page: {e}")
+            if warm:
+                await browser_pool.close_context(warm.context)
+        finally:
+            self._warming[carrier.name] -= 1
+
+    async def _recycle(self, carrier: CarrierPages, warm: WarmPage):
+        """Puts a used page back on the tracking form, or replaces it."""
+        ok = False
+        try:
+            await self._prepare(carrier, warm)
+            warm.parked_at = time.time()
+            self._idle[carrier.name].append(warm)
+            ok = True
+        except Exception as e:
+            print(f"   ⚠️ Page pool: reset of {carrier.name} page failed ({e}). Replacing...")
+            await browser_pool.close_context(warm.context)
+        finally:
+            self._warming[carrier.name] -= 1
+        if not ok:
+            self._top_up(carrier.name)
+
+    # --- LEASING ---
+    @asynccontextmanager
+    async def page(self, name: str):
+        """
+        Leases a page for `name`. Call ready(page) before using it:
+        that is a no-op for warm pages and runs the carrier's prepare
+        step for one-off or long-idle pages.
+        """
+        carrier = self._carriers[name]
+        idle = self._idle[name]
+        warm = None
+        while idle and warm is None:
+            warm = idle.pop()
+            if warm.page.is_closed():
+                await browser_pool.close_context(warm.context)
+                warm = None
+
+        one_off = warm is None
+        if one_off:
+            self.cold_starts += 1
+            warm = await self._open(carrier, use_slot=True)
+            warm.prepared = False
+        else:
+            self.warm_hits += 1
+            # Sessions on the carrier side expire; start from the form again
+            warm.prepared = time.time() - warm.parked_at <= PAGE_POOL_MAX_IDLE
+
+        self._leased[warm.page] = (carrier, warm)
+        warm.savings = BlockCounter()
+        healthy = False
+        try:
+            yield warm.page
+            healthy = not one_off and not warm.blocked and not warm.page.is_closed()
+        finally:
+            self._leased.pop(warm.page, None)
+            selector_cache.release(warm.page)
+            self._record_savings(name, warm.savings)
+            if healthy:
+                self._warming[name] += 1
+                self._spawn(self._recycle(carrier, warm))
+            else:
+                await browser_pool.close_context(warm.context)
+                self._top_up(name)
+
+    async def ready(self, page):
+        """Makes sure a leased page is parked on the tracking form."""
+        carrier, warm = self._leased[page]
+        if not warm.prepared:
+            await self._prepare(carrier, warm)
+            warm.prepared = True
+
+    async def succeeded(self, page):
+        """
+        Saves the session after a successful run so new contexts start from it,
+        and counts the selectors that won on this page.
+        A run can finish without raising on a challenge page, so the page is
+        checked for a block first; a blocked session is never saved.
+        """
+        carrier, warm = self._leased[page]
+        if not warm.blocked:
+            await self._check_blocked(carrier, warm)
+        if not warm.blocked:
+            selector_cache.commit(page)
+            await storage_states.save(carrier.name, warm.context)
+
+    def blocked(self, page):
+        """Called by a driver that hit a WAF block page."""
+        carrier, warm = self._leased[page]
+        self._mark_blocked(carrier, warm)
+
+    def stats(self):
+        return {
+            "warm_hits": self.warm_hits,
+            "cold_starts": self.cold_starts,
+            "carriers": {
+                name: {
+                    "size": carrier.size,
+                    "idle": len(self._idle[name]),
+                    "warming": self._warming[name],
+                    "resource_policy": carrier.policy is not None,
+                    **self._savings[name],
+                }
+                for name, carrier in self._carriers.items()
+            },
+        }
+
+
+page_pool = PagePool()
@@ -0,0 +1,122 @@
+import time
+import random
+import asyncio
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter: `rate` tokens per second, up to `burst`.
+    Callers wait for a token instead of firing unbounded parallel requests.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waited_seconds = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                wait = (1 - self._tokens) / self.rate
+                self.waited_seconds += wait
+                await asyncio.sleep(wait)
+                self._refill()
+            self._tokens -= 1
+
+    def stats(self):
+        self._refill()
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "tokens": round(self._tokens, 2),
+            "waited_seconds": round(self.waited_seconds, 2),
+        }
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker.
+    After `failure_threshold` consecutive failures it opens and callers fail
+    fast for `reset_timeout` seconds; then a single trial call decides
+    whether it closes again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_started = None
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_started = None
+
+        if self.state == self.HALF_OPEN:
+            # A trial that never reported back (e.g. cancelled) doesn't block forever
+            if self._trial_started and time.monotonic() - self._trial_started < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self._trial_started = time.monotonic()
+        return True
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            print(f"   🟢 {self.name}: circuit closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_started = None
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                print(f"   🔴 {self.name}: circuit open after {self.failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+            "retry_in_seconds": (
+                max(0.0, round(self.reset_timeout - (time.monotonic() - self.opened_at), 1))
+                if self.state == self.OPEN else 0.0
+            ),
+        }
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: str = None) -> float:
+    """Exponential backoff with full jitter; honours a numeric Retry-After header."""
+    if retry_after:
+        try:
+            return min(cap, float(retry_after))
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
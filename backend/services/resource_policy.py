@@ -0,0 +1,106 @@
+import os
+from urllib.parse import urlsplit
+
+
+def _csv(value: str):
+    return tuple(item.strip().lower() for item in value.split(",") if item.strip())
+
+
+# Drivers only read text/tables, so skip what only makes the page pretty
+RESOURCE_BLOCK_TYPES = _csv(os.getenv("RESOURCE_BLOCK_TYPES", "image,font,media"))
+# Analytics, ad and chat-widget hosts (subdomains match too)
+RESOURCE_BLOCK_DOMAINS = _csv(os.getenv(
+    "RESOURCE_BLOCK_DOMAINS",
+    "google-analytics.com,googletagmanager.com,doubleclick.net,googleadservices.com,"
+    "facebook.net,connect.facebook.net,hotjar.com,clarity.ms,linkedin.com,licdn.com,"
+    "bing.com,adsrvr.org,intercom.io,intercomcdn.com,zendesk.com,zdassets.com,"
+    "livechatinc.com,drift.com,tawk.to,qualtrics.com,youtube.com,vimeo.com",
+))
+
+# Blocked requests never report a size; these are typical transfer sizes
+# used to estimate what each blocked request would have cost.
+ESTIMATED_BYTES = {
+    "image": 60_000,
+    "font": 40_000,
+    "media": 500_000,
+    "script": 30_000,
+    "stylesheet": 20_000,
+    "xhr": 2_000,
+    "fetch": 2_000,
+}
+DEFAULT_ESTIMATED_BYTES = 10_000
+
+
+def _matches(host: str, domains) -> bool:
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+class ResourcePolicy:
+    """
+    Which requests a carrier's pages may make. Allow-listed domains always
+    pass (e.g. a WAF's challenge script); otherwise a request is aborted if
+    its resource type or its host is on the deny lists.
+    """
+
+    def __init__(self, block_types=(), block_domains=(), allow_domains=()):
+        self.block_types = set(block_types)
+        self.block_domains = tuple(block_domains)
+        self.allow_domains = tuple(allow_domains)
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        host = (urlsplit(url).hostname or "").lower()
+        if _matches(host, self.allow_domains):
+            return False
+        return resource_type in self.block_types or _matches(host, self.block_domains)
+
+
+class BlockCounter:
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self.by_type = {}
+
+    def add(self, resource_type: str):
+        self.requests += 1
+        self.bytes += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+        self.by_type[resource_type] = self.by_type.get(resource_type, 0) + 1
+
+
+def policy_for(carrier: str, enabled: bool = True):
+    """
+    Builds the policy for `carrier` from the environment, or None when the
+    carrier opts out (`enabled=False` or RESOURCE_POLICY_<CARRIER>=off),
+    e.g. because its WAF fingerprints whether images and fonts were fetched.
+    Per-carrier overrides: RESOURCE_BLOCK_TYPES_<CARRIER>,
+    RESOURCE_BLOCK_DOMAINS_<CARRIER>, RESOURCE_ALLOW_DOMAINS_<CARRIER>.
+    """
+    suffix = carrier.upper()
+    default = "on" if enabled else "off"
+    if os.getenv(f"RESOURCE_POLICY_{suffix}", default).lower() in ("off", "false", "0", "none"):
+        return None
+
+    block_types = os.getenv(f"RESOURCE_BLOCK_TYPES_{suffix}")
+    block_domains = os.getenv(f"RESOURCE_BLOCK_DOMAINS_{suffix}")
+    return ResourcePolicy(
+        block_types=_csv(block_types) if block_types is not None else RESOURCE_BLOCK_TYPES,
+        block_domains=_csv(block_domains) if block_domains is not None else RESOURCE_BLOCK_DOMAINS,
+        allow_domains=_csv(os.getenv(f"RESOURCE_ALLOW_DOMAINS_{suffix}", "")),
+    )
+
+
+async def apply_policy(context, policy: ResourcePolicy, get_counter):
+    """
+    Routes every request of `context` through `policy`. Blocked requests
+    are aborted and recorded on the BlockCounter returned by get_counter(),
+    so the caller can swap counters between lookups.
+    """
+
+    async def handle(route):
+        request = route.request
+        if policy.blocks(request.resource_type, request.url):
+            get_counter().add(request.resource_type)
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    await context.route("**/*", handle)
@@ -0,0 +1,74 @@
+import os
+import re
+import json
+import asyncio
+
+# URL patterns (regex, comma separated) of each carrier's background
+# tracking API. Set RESPONSE_CAPTURE_<CARRIER> to override, or to "" to
+# always read the rendered page instead.
+DEFAULT_CAPTURE_PATTERNS = {
+    "msc": r"/api/feature/tools/TrackingInfo",
+    "hapag": r"/api/.*track, /tracing/.*\.json",
+}
+
+
+def capture_patterns(carrier: str):
+    raw = os.getenv(f"RESPONSE_CAPTURE_{carrier.upper()}", DEFAULT_CAPTURE_PATTERNS.get(carrier, ""))
+    return [re.compile(p.strip(), re.IGNORECASE) for p in raw.split(",") if p.strip()]
+
+
+def captured_raw_data(payload) -> str:
+    """Compact JSON text for the AI parser (no indentation, no page chrome)."""
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+async def submit_and_capture(page, carrier: str, submit, rendered_selector: str, timeout: int):
+    """
+    Runs `submit()` (the click/Enter that starts the search) while listening
+    for the carrier's tracking API JSON. Returns (capture, rendered):
+
+    - capture is {"url", "json"} as soon as a matching response arrives,
+      without waiting for rendering or network idle;
+    - otherwise capture is None and `rendered` says whether the page showed
+      `rendered_selector` within `timeout` ms (the DOM fallback).
+    """
+    patterns = capture_patterns(carrier)
+    loop = asyncio.get_running_loop()
+    captured = loop.create_future()
+
+    async def on_response(response):
+        if captured.done() or not any(p.search(response.url) for p in patterns):
+            return
+        if "json" not in response.headers.get("content-type", ""):
+            return
+        try:
+            payload = await response.json()
+        except Exception:
+            return
+        if payload and not captured.done():
+            captured.set_result({"url": response.url, "json": payload})
+
+    if patterns:
+        page.on("response", on_response)
+    rendered = None
+    try:
+        await submit()
+        rendered = asyncio.ensure_future(
+            page.wait_for_selector(rendered_selector, state="visible", timeout=timeout)
+        )
+        await asyncio.wait([captured, rendered], return_when=asyncio.FIRST_COMPLETED)
+
+        if captured.done():
+            return captured.result(), True
+        try:
+            rendered.result()
+            return None, True
+        except Exception:
+            return None, False
+    finally:
+        if patterns:
+            page.remove_listener("response", on_response)
+        if rendered and not rendered.done():
+            rendered.cancel()
+        if not captured.done():
+            captured.cancel()
@@ -1,15 +1,92 @@
 import asyncio
-from playwright.async_api import async_playwright
+from services.page_pool import page_pool, CarrierPages
 from services.utils import (
     STEALTH_ARGS, 
-    create_stealth_context, 
+    get_stealth_context_options,
+    apply_stealth,
     human_type, 
     human_delay,
     human_mouse_movement,
     human_scroll,
-    random_viewport_scroll,
-    kill_cookie_banners
+    random_viewport_scroll
 )
+from services.selector_race import race_selectors
+
+
+CMA_TRACKING_URL = "https://www.cma-cgm.com/ebusiness/tracking"
+
+# CMA-specific consent buttons, on top of the common ones in services/consent.py
+CMA_COOKIE_SELECTORS = [
+    "button[id*='accept']",
+    ".cookie-accept",
+    "[data-testid='cookie-accept']"
+]
+
+async def prepare_cma_page(page):
+    """Parks a page on the CMA CGM tracking page (the consent banner is dismissed in-page)."""
+    # Navigate to tracking page with human-like timing
+    print("   -> Navigating to CMA CGM tracking page...")
+    await page.goto(
+        CMA_TRACKING_URL,
+        wait_until="domcontentloaded",
+        timeout=60000
+    )
+    
+    # Initial human delay to let page fully load
+    await human_delay(2000, 4000)
+    
+    # Simulate human behavior - move mouse around
+    await human_mouse_movement(page)
+
+# Candidates for each step, raced in one wait (see services/selector_race.py)
+CMA_INPUT_SELECTORS = [
+    "input[name*='tracking']",
+    "input[name*='container']",
+    "input[placeholder*='container']",
+    "input[placeholder*='tracking']",
+    "input[id*='tracking']",
+    "input[id*='container']",
+    "#trackingNumber",
+    ".tracking-input",
+    "input[type='text']"
+]
+
+CMA_SEARCH_BUTTON_SELECTORS = [
+    "button[type='submit']",
+    "button:has-text('Search')",
+    "button:has-text('Track')",
+    "button:has-text('Find')",
+    ".search-button",
+    "[data-testid='search-button']",
+    "input[type='submit']"
+]
+
+CMA_RESULT_SELECTORS = [
+    ".tracking-result",
+    ".shipment-details",
+    ".container-info",
+    "[data-testid='tracking-result']",
+    ".result-container",
+    "table.tracking",
+    ".tracking-table"
+]
+
+# HEADFUL mode is critical for bypassing CMA's WAF; the context gets
+# fingerprint spoofing on top. CMA is not on the lookup path (see
+# services/tracking.py), so no pages are kept warm unless PAGE_POOL_CMA is set.
+# Its WAF sees a page that never fetches images/fonts as a bot, so the
+# resource policy is off unless RESOURCE_POLICY_CMA=on.
+page_pool.register(CarrierPages(
+    "cma",
+    prepare_cma_page,
+    headless=False,
+    args=STEALTH_ARGS,
+    setup_context=apply_stealth,
+    default_size=0,
+    block_resources=False,
+    consent_selectors=CMA_COOKIE_SELECTORS,
+    **get_stealth_context_options()
+))
 
 
 async def drive_cma(container_number: str):
@@ -22,55 +99,10 @@ async def drive_cma(container_number: str):
     """
     print(f"[CMA] Official Site Tracking: {container_number}")
     
-    async with async_playwright() as p:
-        # Launch in HEADFUL mode - critical for bypassing CMA's WAF
-        browser = await p.chromium.launch(
-            headless=False,
-            args=STEALTH_ARGS
-        )
-        
-        # Create stealth context with fingerprint spoofing
-        context = await create_stealth_context(browser)
-        page = await context.new_page()
-
+    async with page_pool.page("cma") as page:
         try:
-            # 1. Navigate to tracking page with human-like timing
-            print("   -> Navigating to CMA CGM tracking page...")
-            await page.goto(
-                "https://www.cma-cgm.com/ebusiness/tracking",
-                wait_until="domcontentloaded",
-                timeout=60000
-            )
-            
-            # Initial human delay to let page fully load
-            await human_delay(2000, 4000)
-            
-            # Simulate human behavior - move mouse around
-            await human_mouse_movement(page)
-            
-            # 2. Handle cookie consent banner
-            print("   -> Checking for cookie banner...")
-            await kill_cookie_banners(page)
-            
-            # Additional CMA-specific cookie selectors
-            cma_cookie_selectors = [
-                "#onetrust-accept-btn-handler",
-                "button[id*='accept']",
-                "button:has-text('Accept')",
-                "button:has-text('I Accept')",
-                ".cookie-accept",
-                "[data-testid='cookie-accept']"
-            ]
-            
-            for sel in cma_cookie_selectors:
-                try:
-                    if await page.locator(sel).first.is_visible(timeout=2000):
-                        print(f"   -> Found cookie button: {sel}")
-                        await page.locator(sel).first.click()
-                        await human_delay(1000, 2000)
-                        break
-                except:
-                    continue
+            # 1-2. Tracking page (warm pages are already there)
+            await page_pool.ready(page)
             
             # 3. Simulate natural browsing - scroll around
             await random_viewport_scroll(page)
@@ -79,28 +111,9 @@ async def drive_cma(container_number: str):
             # 4. Find the tracking input field
             print("   -> Looking for tracking input field...")
             
-            # Common selectors for CMA tracking input
-            input_selectors = [
-                "input[name*='tracking']",
-                "input[name*='container']",
-                "input[placeholder*='container']",
-                "input[placeholder*='tracking']",
-                "input[id*='tracking']",
-                "input[id*='container']",
-                "#trackingNumber",
-                ".tracking-input",
-                "input[type='text']"
-            ]
-            
-            input_selector = None
-            for sel in input_selectors:
-                try:
-                    if await page.locator(sel).first.is_visible(timeout=3000):
-                        input_selector = sel
-                        print(f"   -> Found input: {sel}")
-                        break
-                except:
-                    continue
+            input_selector = await race_selectors(page, "cma", "input", CMA_INPUT_SELECTORS, timeout=10000)
+            if input_selector:
+                print(f"   -> Found input: {input_selector}")
             
             if not input_selector:
                 print("   -> Could not find tracking input. Taking screenshot...")
@@ -110,7 +123,7 @@ async def drive_cma(container_number: str):
                 content = await page.content()
                 if "Access blocked" in content or "blocked" in content.lower():
                     print("   -> ACCESS BLOCKED detected. WAF triggered.")
-                    await browser.close()
+                    page_pool.blocked(page)
                     return {
                         "source": "CMA CGM Official",
                         "container": container_number,
@@ -118,7 +131,6 @@ async def drive_cma(container_number: str):
                         "raw_data": "Access blocked by WAF. Consider using a residential proxy."
                     }
                 
-                await browser.close()
                 return None
             
             # 5. Move mouse to input and click
@@ -140,27 +152,13 @@ async def drive_cma(container_number: str):
             # 7. Find and click the search button or press Enter
             print("   -> Submitting search...")
             
-            search_button_selectors = [
-                "button[type='submit']",
-                "button:has-text('Search')",
-                "button:has-text('Track')",
-                "button:has-text('Find')",
-                ".search-button",
-                "[data-testid='search-button']",
-                "input[type='submit']"
-            ]
-            
+            search_button = await race_selectors(page, "cma", "search_button", CMA_SEARCH_BUTTON_SELECTORS, timeout=3000)
             search_clicked = False
-            for sel in search_button_selectors:
-                try:
-                    if await page.locator(sel).first.is_visible(timeout=2000):
-                        await human_mouse_movement(page)
-                        await page.locator(sel).first.click()
-                        search_clicked = True
-                        print(f"   -> Clicked search button: {sel}")
-                        break
-                except:
-                    continue
+            if search_button:
+                await human_mouse_movement(page)
+                await page.locator(search_button).first.click()
+                search_clicked = True
+                print(f"   -> Clicked search button: {search_button}")
             
             if not search_clicked:
                 # Fallback: press Enter
@@ -183,7 +181,7 @@ async def drive_cma(container_number: str):
             if "Access blocked" in page_content or "blocked" in page_content.lower():
                 print("   -> ACCESS BLOCKED detected after search.")
                 await page.screenshot(path="cma_blocked.png")
-                await browser.close()
+                page_pool.blocked(page)
                 return {
                     "source": "CMA CGM Official",
                     "container": container_number,
@@ -195,25 +193,11 @@ async def drive_cma(container_number: str):
             print("   -> Extracting tracking data...")
             
             # Look for result containers
-            result_selectors = [
-                ".tracking-result",
-                ".shipment-details",
-                ".container-info",
-                "[data-testid='tracking-result']",
-                ".result-container",
-                "table.tracking",
-                ".tracking-table"
-            ]
-            
             result_content = None
-            for sel in result_selectors:
-                try:
-                    if await page.locator(sel).first.is_visible(timeout=2000):
-                        result_content = await page.locator(sel).first.inner_text()
-                        print(f"   -> Found result container: {sel}")
-                        break
-                except:
-                    continue
+            result_selector = await race_selectors(page, "cma", "result", CMA_RESULT_SELECTORS, timeout=5000)
+            if result_selector:
+                result_content = await page.locator(result_selector).first.inner_text()
+                print(f"   -> Found result container: {result_selector}")
             
             if not result_content:
                 # Fallback: get the main content area
@@ -233,7 +217,7 @@ async def drive_cma(container_number: str):
             
             if any(indicator in result_content.lower() for indicator in error_indicators):
                 print("   -> Container not found in CMA system.")
-                await browser.close()
+                await page_pool.succeeded(page)
                 return {
                     "source": "CMA CGM Official",
                     "container": container_number,
@@ -244,10 +228,9 @@ async def drive_cma(container_number: str):
             # Take a screenshot for debugging
             await page.screenshot(path="cma_result.png")
             
-            await browser.close()
-            
             print(f"   -> Successfully extracted {len(result_content)} characters of tracking data")
             
+            await page_pool.succeeded(page)
             return {
                 "source": "CMA CGM Official",
                 "container": container_number,
@@ -261,10 +244,5 @@ async def drive_cma(container_number: str):
             except:
                 pass
             
-            try:
-                await browser.close()
-            except:
-                pass
-            
             # Return None to allow fallback to manual check message
             return None
@@ -1,37 +1,153 @@
+import os
 import asyncio
-from playwright.async_api import async_playwright
-from services.utils import STEALTH_ARGS, human_type, kill_cookie_banners
+from bs4 import BeautifulSoup
+from services.page_pool import page_pool, CarrierPages
+from services.http_client import get_client
+from services.storage_state import looks_blocked
+from services.utils import STEALTH_ARGS, CHROME_USER_AGENT, human_type
+
+EVERGREEN_TRACKING_URL = "https://ct.shipmentlink.com/servlet/TDB1_CargoTracking.do"
+
+# "http" submits the tracking form with the shared HTTP client and only
+# falls back to Chromium when that is challenged; "browser" always drives Chromium.
+EVERGREEN_DRIVER_MODE = os.getenv("EVERGREEN_DRIVER_MODE", "http").lower()
+
+# Fields frmSubmit(13, 2) sets on top of the form's own inputs (key=value, comma separated)
+EVERGREEN_HTTP_FIELDS = os.getenv("EVERGREEN_HTTP_FIELDS", "TYPE=CNTR")
+
+EVERGREEN_NOT_FOUND_MARKERS = ("no information", "not found", "invalid")
+
+HTTP_HEADERS = {
+    "User-Agent": CHROME_USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+class HttpPathUnavailable(Exception):
+    """The plain-HTTP submission was challenged or returned an unexpected page."""
+
+
+async def prepare_evergreen_page(page):
+    """Parks a page on the ShipmentLink cargo tracking form (the cookie banner is dismissed in-page)."""
+    print("   -> Navigating to ShipmentLink...")
+    await page.goto(EVERGREEN_TRACKING_URL, timeout=60000)
+    await page.wait_for_selector("input#s_cntr", state="visible", timeout=10000)
+
+# In http mode the browser is only a fallback, so no page is kept warm by default
+page_pool.register(CarrierPages(
+    "evergreen",
+    prepare_evergreen_page,
+    headless=True,
+    args=STEALTH_ARGS,
+    default_size=0 if EVERGREEN_DRIVER_MODE == "http" else 1
+))
+
+
+def _form_fields(html: str, container_number: str) -> dict:
+    """The tracking form's inputs with 'Container No.' selected and filled in."""
+    soup = BeautifulSoup(html, "html.parser")
+    radio = soup.select_one("input#s_cntr")
+    number_input = soup.select_one("input#NO")
+    if radio is None or number_input is None:
+        raise HttpPathUnavailable("tracking form not found")
+
+    form = number_input.find_parent("form") or soup
+    fields = {}
+    for el in form.find_all("input"):
+        name = el.get("name")
+        if not name or el.get("type", "").lower() in ("button", "submit", "image", "reset"):
+            continue
+        if el.get("type", "").lower() in ("radio", "checkbox") and not el.has_attr("checked"):
+            continue
+        fields[name] = el.get("value", "")
+
+    fields[radio.get("name", "SEL")] = radio.get("value", "s_cntr")
+    fields[number_input.get("name", "NO")] = container_number
+    for pair in EVERGREEN_HTTP_FIELDS.split(","):
+        if "=" in pair:
+            key, value = pair.split("=", 1)
+            fields[key.strip()] = value.strip()
+    return fields
+
+
+def _tables_text(html: str) -> str:
+    """Result tables as 'cell | cell' lines, skipping layout tables that nest others."""
+    soup = BeautifulSoup(html, "html.parser")
+    blocks = []
+    for table in soup.find_all("table"):
+        if table.find("table"):
+            continue
+        rows = []
+        for tr in table.find_all("tr"):
+            cells = [cell.get_text(" ", strip=True) for cell in tr.find_all(["th", "td"])]
+            cells = [cell for cell in cells if cell]
+            if cells:
+                rows.append(" | ".join(cells))
+        if rows:
+            blocks.append("\n".join(rows))
+    return "\n\n".join(blocks)
+
+
+async def _drive_evergreen_http(container_number: str):
+    """
+    Same submission as the browser's frmSubmit(13, 2), as two plain requests.
+    Returns the driver result, None when ShipmentLink has no data for the
+    container, or raises HttpPathUnavailable.
+    """
+    client = get_client("shipmentlink")
+    form_page = await client.get(EVERGREEN_TRACKING_URL, headers=HTTP_HEADERS)
+    if form_page.status_code != 200 or looks_blocked(form_page.text):
+        raise HttpPathUnavailable(f"form page returned {form_page.status_code}")
+
+    response = await client.post(
+        EVERGREEN_TRACKING_URL,
+        data=_form_fields(form_page.text, container_number),
+        headers={**HTTP_HEADERS, "Referer": EVERGREEN_TRACKING_URL},
+    )
+    html = response.text
+    if response.status_code != 200 or looks_blocked(html):
+        raise HttpPathUnavailable(f"results returned {response.status_code}")
+
+    content = _tables_text(html)
+    if container_number.upper() not in content.upper():
+        text = BeautifulSoup(html, "html.parser").get_text(" ", strip=True).lower()
+        if any(marker in text for marker in EVERGREEN_NOT_FOUND_MARKERS):
+            print("   ❌ Container not found or error message detected.")
+            return None
+        raise HttpPathUnavailable("no result tables for the container")
+
+    print(f"   ✅ Successfully extracted {len(content)} characters of tracking data over HTTP")
+    return {
+        "source": "Evergreen (via ShipmentLink)",
+        "container": container_number,
+        "raw_data": content
+    }
+
 
 async def drive_evergreen(container_number: str):
     """
     Evergreen Driver (Via ShipmentLink)
     URL: https://ct.shipmentlink.com/servlet/TDB1_CargoTracking.do
+    Plain HTTP first (see EVERGREEN_DRIVER_MODE), Chromium as the fallback.
     """
+    if EVERGREEN_DRIVER_MODE == "http":
+        print(f"🚢 [Evergreen] Tracking via ShipmentLink (HTTP): {container_number}")
+        try:
+            return await _drive_evergreen_http(container_number)
+        except Exception as e:
+            print(f"   ⚠️ HTTP path unavailable ({e}). Falling back to browser...")
+    return await _drive_evergreen_browser(container_number)
+
+
+async def _drive_evergreen_browser(container_number: str):
+    """Chromium path: selects 'Container No.', types the number and calls frmSubmit(13, 2)."""
     print(f"🚢 [Evergreen] Tracking via ShipmentLink: {container_number}")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True, args=STEALTH_ARGS)
-        context = await browser.new_context()
-        page = await context.new_page()
-
+    async with page_pool.page("evergreen") as page:
         try:
-            # 1. Navigate to ShipmentLink tracking page
-            print("   -> Navigating to ShipmentLink...")
-            await page.goto("https://ct.shipmentlink.com/servlet/TDB1_CargoTracking.do", timeout=60000)
-            await asyncio.sleep(2)
-
-            # 2. Handle cookie banners
-            await kill_cookie_banners(page)
-            
-            # Additional check for ShipmentLink specific cookie button
-            try:
-                accept_all = page.locator("button:has-text('Accept All')")
-                if await accept_all.is_visible(timeout=3000):
-                    print("   🍪 Clicking 'Accept All' cookies...")
-                    await accept_all.click()
-                    await asyncio.sleep(1)
-            except:
-                pass
+            # 1-2. Tracking form (warm pages are already there)
+            await page_pool.ready(page)
 
             # 3. Select "Container No." radio button (IMPORTANT: s_bl is checked by default, not s_cntr!)
             print("   -> Selecting 'Container No.' radio button...")
@@ -105,7 +221,6 @@ async def drive_evergreen(container_number: str):
                 try:
                     if await page.locator(error_sel).is_visible(timeout=1000):
                         print("   ❌ Container not found or error message detected.")
-                        await browser.close()
                         return None
                 except:
                     continue
@@ -114,8 +229,6 @@ async def drive_evergreen(container_number: str):
             # ShipmentLink typically displays results in tables or divs
             content = await page.inner_text("body")
             
-            await browser.close()
-            
             # Basic validation - check if we got meaningful data
             if len(content) < 100 or "TDB1_CargoTracking" in content:
                 print("   ⚠️ Insufficient tracking data received.")
@@ -123,6 +236,7 @@ async def drive_evergreen(container_number: str):
 
             print(f"   ✅ Successfully extracted {len(content)} characters of tracking data")
             
+            await page_pool.succeeded(page)
             return {
                 "source": "Evergreen (via ShipmentLink)",
                 "container": container_number,
@@ -131,9 +245,5 @@ async def drive_evergreen(container_number: str):
 
         except Exception as e:
             print(f"   ❌ Evergreen Driver Failed: {e}")
-            try:
-                await browser.close()
-            except:
-                pass
             return None
 
@@ -1,6 +1,25 @@
-import asyncio
-from playwright.async_api import async_playwright
+from services.page_pool import page_pool, CarrierPages
 from services.utils import STEALTH_ARGS, human_type
+from services.response_capture import submit_and_capture, captured_raw_data
+from services.selector_race import wait_for_any_visible
+
+HAPAG_TRACKING_URL = "https://www.hapag-lloyd.com/en/online-business/track/track-by-container-solution.html"
+HAPAG_INPUT_SELECTORS = ['[id="tracing_by_container_f:hl12"]', "input.hal-olb-input"]
+
+async def prepare_hapag_page(page):
+    """Parks a page on the Hapag track-by-container form."""
+    await page.goto(HAPAG_TRACKING_URL, timeout=60000)
+    if not await wait_for_any_visible(page, HAPAG_INPUT_SELECTORS, timeout=30000):
+        raise RuntimeError("Hapag tracking form did not load")
+
+# Hapag's OneTrust popup uses "Select All" instead of the usual accept button
+page_pool.register(CarrierPages(
+    "hapag",
+    prepare_hapag_page,
+    headless=False,
+    args=STEALTH_ARGS,
+    consent_selectors=["#accept-recommended-btn-handler"]
+))
 
 async def drive_hapag(container_number: str):
     """
@@ -9,41 +28,18 @@ async def drive_hapag(container_number: str):
     """
     print(f"🚢 [Hapag] Official Site Tracking: {container_number}")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False, args=STEALTH_ARGS)
-        context = await browser.new_context()
-        page = await context.new_page()
-
+    async with page_pool.page("hapag") as page:
         try:
-            await page.goto("https://www.hapag-lloyd.com/en/online-business/track/track-by-container-solution.html", timeout=60000)
-            
-            # 1. WAIT FOR & KILL POPUP (The Fix)
-            print("   -> Waiting for OneTrust Cookie Popup...")
-            try:
-                # We use the EXACT ID you provided
-                cookie_id = "#accept-recommended-btn-handler"
-                
-                # Wait explicitly for this element to exist in the DOM
-                await page.wait_for_selector(cookie_id, state="visible", timeout=10000)
-                
-                print("   🍪 Found 'Select All'. Clicking...")
-                # Force click in case it's animating
-                await page.click(cookie_id, force=True)
-                
-                # Wait for it to disappear so it doesn't block the input
-                await asyncio.sleep(2)
-                print("   -> Popup dismissed.")
-                
-            except Exception as e:
-                print(f"   ⚠️ Cookie banner did not appear or timed out: {e}")
+            # 1. Tracking form (warm pages are already there)
+            await page_pool.ready(page)
 
             # 2. Input
             print("   -> Finding Input...")
-            input_selector = '[id="tracing_by_container_f:hl12"]'
+            input_selector = HAPAG_INPUT_SELECTORS[0]
             
             # Fallback selector if ID changes
             if not await page.locator(input_selector).is_visible():
-                input_selector = "input.hal-olb-input"
+                input_selector = HAPAG_INPUT_SELECTORS[1]
 
             await page.wait_for_selector(input_selector, state="visible")
             await page.click(input_selector)
@@ -56,21 +52,33 @@ async def drive_hapag(container_number: str):
             if not await page.locator(button_selector).is_visible():
                 button_selector = "button:has-text('Find')"
 
-            await page.click(button_selector)
-
-            # 4. Wait for Results
+            # 4. Wait for Results: the tracking JSON if the page fetches one,
+            # otherwise the rendered table
             print("   -> Waiting for results...")
-            try:
-                await page.wait_for_selector("table, .hal-table", timeout=20000)
-            except:
+            captured, rendered = await submit_and_capture(
+                page,
+                "hapag",
+                lambda: page.click(button_selector),
+                "table, .hal-table",
+                timeout=20000
+            )
+            if captured:
+                print(f"   ✅ Captured tracking API response: {captured['url']}")
+                await page_pool.succeeded(page)
+                return {
+                    "source": "Hapag Official (API)",
+                    "container": container_number,
+                    "raw_data": captured_raw_data(captured["json"]),
+                    "json": captured["json"]
+                }
+            if not rendered:
                 print("   ⚠️ Table selector timeout. Waiting for network idle...")
                 await page.wait_for_load_state("networkidle")
 
             # 5. Extract Data
             content = await page.inner_text("body")
             
-            await browser.close()
-            
+            await page_pool.succeeded(page)
             return {
                 "source": "Hapag Official",
                 "container": container_number,
@@ -79,5 +87,4 @@ async def drive_hapag(container_number: str):
 
         except Exception as e:
             print(f"   ❌ Hapag Driver Failed: {e}")
-            await browser.close()
             return None
\ No newline at end of file
@@ -1,7 +1,90 @@
 import asyncio
 import re
-from playwright.async_api import async_playwright
+from services.page_pool import page_pool, CarrierPages
 from services.utils import STEALTH_ARGS, human_type
+from services.selector_race import race_selectors, wait_for_any_visible
+
+HMM_TRACKING_URL = "https://www.hmm21.com/e-service/general/trackNTrace/TrackNTrace.do"
+
+HMM_ARGS = STEALTH_ARGS + [
+    "--disable-http2", 
+    "--no-zygote",
+    "--window-size=1920,1080"
+]
+
+# The top search bar has placeholder "B/L, Booking, CNTR No., Keywords"
+# Try multiple possible selectors for the header search input
+HMM_INPUT_SELECTORS = [
+    "input[placeholder*='B/L']",
+    "input[placeholder*='CNTR']",
+    "input[placeholder*='Keywords']",
+    "header input[type='text']",
+    ".header-search input",
+    "#searchInput"
+]
+
+HMM_RESULT_SELECTORS = [
+    ".result-area",
+    "#resultArea", 
+    ".tracking-result",
+    "table.result",
+    ".container-info"
+]
+
+async def hide_automation_flags(context):
+    await context.add_init_script("""
+        Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
+    """)
+
+async def prepare_hmm_page(page):
+    """Parks a page on the HMM Track & Trace page with the header search bar loaded."""
+    print("   -> Loading HMM tracking page...")
+    await page.goto(HMM_TRACKING_URL, timeout=60000, wait_until="domcontentloaded")
+    if not await wait_for_any_visible(page, HMM_INPUT_SELECTORS, timeout=15000):
+        raise RuntimeError("HMM search bar did not load")
+
+async def _network_settled(page):
+    try:
+        await page.wait_for_load_state("networkidle", timeout=15000)
+        await asyncio.sleep(2)  # Extra time for dynamic content
+        return True
+    except Exception:
+        return False
+
+async def wait_for_results(page):
+    """
+    Returns (result_selector, settled) as soon as a known result area is
+    visible or the network has gone idle (plus a short settle), whichever
+    comes first. Pages without any known result area still only wait for
+    the network, as before.
+    """
+    race = asyncio.ensure_future(race_selectors(page, "hmm", "result", HMM_RESULT_SELECTORS, timeout=15000))
+    settle = asyncio.ensure_future(_network_settled(page))
+    pending = {race, settle}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if race in done and race.result():
+                return race.result(), False
+            if settle in done:
+                return None, settle.result()
+        return None, False
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+page_pool.register(CarrierPages(
+    "hmm",
+    prepare_hmm_page,
+    headless=False,
+    args=HMM_ARGS,
+    setup_context=hide_automation_flags,
+    ignore_https_errors=True,
+    viewport={'width': 1920, 'height': 1080},
+    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+))
 
 async def drive_hmm(container_number: str):
     """
@@ -9,38 +92,11 @@ async def drive_hmm(container_number: str):
     Actually fills the form and submits it like a real user.
     """
     print(f"🚢 [HMM] Official Site Tracking: {container_number}")
-    
-    async with async_playwright() as p:
-        custom_args = STEALTH_ARGS + [
-            "--disable-http2", 
-            "--no-zygote",
-            "--window-size=1920,1080"
-        ]
-        
-        browser = await p.chromium.launch(
-            headless=False,  
-            args=custom_args
-        )
-        
-        context = await browser.new_context(
-            ignore_https_errors=True,
-            viewport={'width': 1920, 'height': 1080},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
-        
-        # Hide automation flags
-        await context.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
-        """)
-
-        page = await context.new_page()
 
+    async with page_pool.page("hmm") as page:
         try:
-            # 1. Load the tracking page
-            print("   -> Loading HMM tracking page...")
-            await page.goto("https://www.hmm21.com/e-service/general/trackNTrace/TrackNTrace.do", 
-                          timeout=60000, 
-                          wait_until="domcontentloaded")
+            # 1. Tracking page (warm pages are already there)
+            await page_pool.ready(page)
             
             # Wait a bit for page to settle
             await asyncio.sleep(2)
@@ -48,41 +104,18 @@ async def drive_hmm(container_number: str):
             # 2. Find and fill the TOP SEARCH BAR in the header
             print(f"   -> Entering container number in top search bar: {container_number}")
             
-            # The top search bar has placeholder "B/L, Booking, CNTR No., Keywords"
-            # Try multiple possible selectors for the header search input
-            input_selectors = [
-                "input[placeholder*='B/L']",
-                "input[placeholder*='CNTR']",
-                "input[placeholder*='Keywords']",
-                "header input[type='text']",
-                ".header-search input",
-                "#searchInput"
-            ]
-            
-            input_found = False
-            used_selector = None
-            for selector in input_selectors:
-                try:
-                    await page.wait_for_selector(selector, state="visible", timeout=5000)
-                    print(f"   ✅ Found top search bar with selector: {selector}")
-                    
-                    # Click and type
-                    await page.click(selector)
-                    await asyncio.sleep(0.5)
-                    await page.fill(selector, "")  # Clear first
-                    await human_type(page, selector, container_number)
-                    
-                    input_found = True
-                    used_selector = selector
-                    break
-                except:
-                    continue
-            
-            if not input_found:
+            used_selector = await race_selectors(page, "hmm", "input", HMM_INPUT_SELECTORS, timeout=5000)
+            if not used_selector:
                 print("   ❌ Could not find top search bar")
                 await page.screenshot(path="/tmp/hmm_no_input.png")
-                await browser.close()
                 return None
+            print(f"   ✅ Found top search bar with selector: {used_selector}")
+            
+            # Click and type
+            await page.click(used_selector)
+            await asyncio.sleep(0.5)
+            await page.fill(used_selector, "")  # Clear first
+            await human_type(page, used_selector, container_number)
             
             # 3. Press Enter or click search icon in the header
             print("   -> Submitting search (pressing Enter)...")
@@ -93,13 +126,12 @@ async def drive_hmm(container_number: str):
             # 4. Wait for results to load
             print("   -> Waiting for results...")
             
-            # Wait for either results or error message
-            try:
-                # Wait for page to update (look for common result indicators)
-                await page.wait_for_load_state("networkidle", timeout=15000)
-                await asyncio.sleep(2)  # Extra time for dynamic content
+            result_selector, settled = await wait_for_results(page)
+            if result_selector:
+                print(f"   ✅ Results loaded ({result_selector})")
+            elif settled:
                 print("   ✅ Page loaded")
-            except:
+            else:
                 print("   ⚠️ Timeout waiting for results, proceeding anyway...")
             
             # 5. Extract the tracking data
@@ -115,16 +147,8 @@ async def drive_hmm(container_number: str):
             content = await page.content()
             
             # Also try to get specific result areas
-            result_selectors = [
-                ".result-area",
-                "#resultArea", 
-                ".tracking-result",
-                "table.result",
-                ".container-info"
-            ]
-            
             result_text = ""
-            for selector in result_selectors:
+            for selector in HMM_RESULT_SELECTORS:
                 try:
                     element = page.locator(selector)
                     if await element.count() > 0:
@@ -150,9 +174,8 @@ async def drive_hmm(container_number: str):
                 f.write("="*80 + "\n")
                 f.write(final_content)
             print(f"   📝 Response saved to: {debug_file}")
-
-            await browser.close()
             
+            await page_pool.succeeded(page)
             return {
                 "source": "HMM Official (Form Interaction)",
                 "container": container_number,
@@ -166,5 +189,4 @@ async def drive_hmm(container_number: str):
                 print("   📸 Crash screenshot saved to /tmp/hmm_crash.png")
             except:
                 pass
-            await browser.close()
             return None
\ No newline at end of file
@@ -1,6 +1,17 @@
 import asyncio
-from playwright.async_api import async_playwright
-from services.utils import STEALTH_ARGS, human_type, kill_cookie_banners
+from services.page_pool import page_pool, CarrierPages
+from services.utils import STEALTH_ARGS, human_type
+from services.response_capture import submit_and_capture, captured_raw_data
+
+MSC_TRACKING_URL = "https://www.msc.com/en/track-a-shipment"
+MSC_INPUT_SELECTOR = "#trackingNumber"
+
+async def prepare_msc_page(page):
+    """Parks a page on the MSC tracking form (the cookie banner is dismissed in-page)."""
+    await page.goto(MSC_TRACKING_URL, timeout=60000)
+    await page.wait_for_selector(MSC_INPUT_SELECTOR, state="visible")
+
+page_pool.register(CarrierPages("msc", prepare_msc_page, headless=False, args=STEALTH_ARGS))
 
 async def drive_msc(container_number: str):
     """
@@ -9,20 +20,14 @@ async def drive_msc(container_number: str):
     """
     print(f"🚢 [MSC] Official Site Tracking: {container_number}")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False, args=STEALTH_ARGS)
-        context = await browser.new_context()
-        page = await context.new_page()
-
+    async with page_pool.page("msc") as page:
         try:
-            await page.goto("https://www.msc.com/en/track-a-shipment", timeout=60000)
-            
-            # 1. Kill Cookies (Aggressive)
-            await kill_cookie_banners(page)
+            # 1. Tracking form (warm pages are already there)
+            await page_pool.ready(page)
 
             # 2. Input Handling
             print("   -> Finding Input...")
-            input_selector = "#trackingNumber"
+            input_selector = MSC_INPUT_SELECTOR
             await page.wait_for_selector(input_selector, state="visible")
             
             # Focus and Type
@@ -45,20 +50,30 @@ async def drive_msc(container_number: str):
             # 4. Trigger Search via Keyboard
             # Pressing Enter is usually safer than clicking buttons covered by overlays
             print("   -> Pressing Enter...")
-            await page.press(input_selector, "Enter")
 
             # 5. Wait for Results
+            # The tracker is filled from a JSON call: take that as soon as it
+            # arrives, else wait for EITHER the Error Box OR the Result Box.
             print("   -> Waiting for response...")
-            
-            # Wait for EITHER the Error Box OR the Result Box
-            # We assume one of these MUST appear.
-            try:
-                await page.wait_for_selector(
-                    ".msc-flow-tracking__result, .msc-flow-tracking__error", 
-                    timeout=15000
-                )
+            captured, rendered = await submit_and_capture(
+                page,
+                "msc",
+                lambda: page.press(input_selector, "Enter"),
+                ".msc-flow-tracking__result, .msc-flow-tracking__error",
+                timeout=15000
+            )
+            if captured:
+                print(f"   ✅ Captured tracking API response: {captured['url']}")
+                await page_pool.succeeded(page)
+                return {
+                    "source": "MSC Official (API)",
+                    "container": container_number,
+                    "raw_data": captured_raw_data(captured["json"]),
+                    "json": captured["json"]
+                }
+            if rendered:
                 print("   ✅ Page updated.")
-            except:
+            else:
                 print("   ⚠️ Wait timed out. Taking screenshot for debug...")
                 await page.screenshot(path="msc_debug_error.png")
                 # If timeout, we grab whatever text is visible as a last resort
@@ -69,7 +84,7 @@ async def drive_msc(container_number: str):
             if await error_el.is_visible():
                 error_text = await error_el.inner_text()
                 print(f"   -> Found Error Message: {error_text.strip()}")
-                await browser.close()
+                await page_pool.succeeded(page)
                 return {
                     "source": "MSC Official",
                     "container": container_number,
@@ -85,8 +100,7 @@ async def drive_msc(container_number: str):
                 # Fallback to body if specific element missing
                 content = await page.inner_text("body")
             
-            await browser.close()
-            
+            await page_pool.succeeded(page)
             return {
                 "source": "MSC Official",
                 "container": container_number,
@@ -98,5 +112,4 @@ async def drive_msc(container_number: str):
             try:
                 await page.screenshot(path="msc_crash.png")
             except: pass
-            await browser.close()
             return None
\ No newline at end of file
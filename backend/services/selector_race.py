@@ -0,0 +1,152 @@
+import os
+import json
+import asyncio
+import threading
+
+# Which candidate selector won, per carrier and driver step, so the next
+# lookup prefers it. Survives restarts.
+SELECTOR_CACHE_PATH = os.getenv("SELECTOR_CACHE_PATH", "/tmp/cargoo_selectors.json")
+# Wins are written out at most this often, off the event loop
+SELECTOR_CACHE_SAVE_DELAY = float(os.getenv("SELECTOR_CACHE_SAVE_DELAY", "5"))
+
+
+class SelectorCache:
+    """
+    Win counts per (carrier, step, selector), persisted as JSON.
+
+    A race only holds its winner against the page (hold()); the win is
+    counted by commit() once the lookup on that page has succeeded. A
+    catch-all candidate that shows up first on a slow render therefore
+    can't outrank the specific selector unless it actually worked.
+    """
+
+    def __init__(self, path: str, save_delay: float = SELECTOR_CACHE_SAVE_DELAY):
+        self.path = path
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._wins = {}   # "carrier/step" -> {selector: wins}
+        self._dirty = False
+        self._save_handle = None
+        self._save_tasks = set()
+        self._held = {}   # page -> {(carrier, step): selector}
+        try:
+            with open(path) as f:
+                self._wins = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def rank(self, carrier: str, step: str, candidates):
+        """Candidates ordered by past wins; ties keep the driver's order."""
+        wins = self._wins.get(f"{carrier}/{step}", {})
+        return sorted(candidates, key=lambda sel: -wins.get(sel, 0))
+
+    def hold(self, page, carrier: str, step: str, selector: str):
+        self._held.setdefault(page, {})[(carrier, step)] = selector
+
+    def commit(self, page):
+        """Counts the wins held for `page`; called when its lookup succeeded."""
+        for (carrier, step), selector in self._held.pop(page, {}).items():
+            self.record(carrier, step, selector)
+
+    def release(self, page):
+        """Drops the wins held for `page` without counting them."""
+        self._held.pop(page, None)
+
+    def record(self, carrier: str, step: str, selector: str):
+        with self._lock:
+            wins = self._wins.setdefault(f"{carrier}/{step}", {})
+            wins[selector] = wins.get(selector, 0) + 1
+            self._dirty = True
+        if self._save_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.save()
+                return
+            self._save_handle = loop.call_later(self.save_delay, self._save_in_background)
+
+    def _save_in_background(self):
+        self._save_handle = None
+        task = asyncio.ensure_future(asyncio.to_thread(self.save))
+        self._save_tasks.add(task)
+        task.add_done_callback(self._save_tasks.discard)
+
+    def save(self):
+        """Writes the win counts if they changed since the last save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._wins)
+            self._dirty = False
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"   ⚠️ Could not save selector cache: {e}")
+
+    def stats(self):
+        return {
+            key: max(wins, key=wins.get)
+            for key, wins in self._wins.items() if wins
+        }
+
+
+selector_cache = SelectorCache(SELECTOR_CACHE_PATH)
+
+
+def visible(selector: str) -> str:
+    """`selector` narrowed to its visible matches (not just the first match)."""
+    return f"{selector} >> visible=true"
+
+
+async def wait_for_any_visible(page, selectors, timeout: int = 10000):
+    """
+    Races one visibility wait per selector and returns the first selector
+    with a visible match, or None on timeout. A single wait on "a, b" only
+    checks the first element matching the union, so a hidden early match
+    would mask a visible one further down the page.
+    """
+    waits = {
+        asyncio.ensure_future(page.wait_for_selector(visible(sel), state="visible", timeout=timeout)): sel
+        for sel in selectors
+    }
+    pending = set(waits)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is None:
+                    return waits[task]
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def race_selectors(page, carrier: str, step: str, candidates, timeout: int = 10000):
+    """
+    Waits for ANY of `candidates` to be visible and returns the best one
+    that matched (highest ranked in selector_cache), narrowed to its visible
+    elements so the caller's click/type hits the visible control; None on
+    timeout. Replaces probing candidates one by one with a timeout each.
+    The winner only counts once the lookup succeeds (see SelectorCache).
+    """
+    ranked = selector_cache.rank(carrier, step, candidates)
+    winner = await wait_for_any_visible(page, ranked, timeout)
+    if winner is None:
+        return None
+
+    # Several candidates may be visible at once; pick the most trusted one
+    for sel in ranked:
+        try:
+            if await page.locator(visible(sel)).count() > 0:
+                selector_cache.hold(page, carrier, step, sel)
+                return visible(sel)
+        except Exception:
+            continue
+    selector_cache.hold(page, carrier, step, winner)
+    return visible(winner)
@@ -0,0 +1,50 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight task.
+    Late callers await the leader's result instead of repeating the work.
+    The shared task is only cancelled once every waiter has gone away.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight = {}   # key -> [task, waiter_count]
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        entry = self._inflight.get(key)
+        if entry:
+            self.coalesced += 1
+            print(f"   🔗 {self.name}: joining in-flight lookup for {key}")
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            entry = [task, 0]
+            self._inflight[key] = entry
+            task.add_done_callback(lambda _: self._release(key, entry))
+
+        task = entry[0]
+        entry[1] += 1
+        try:
+            # Shield so one caller going away doesn't cancel the others
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and entry[1] == 1:
+                task.cancel()
+            raise
+        finally:
+            entry[1] -= 1
+
+    def _release(self, key, entry):
+        if self._inflight.get(key) is entry:
+            del self._inflight[key]
+
+    def stats(self):
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,104 @@
+import os
+import json
+import time
+
+# Per-carrier Playwright storage state (cookies + localStorage): consent
+# tokens and WAF clearance cookies survive from one context to the next.
+STORAGE_STATE_DIR = os.getenv("STORAGE_STATE_DIR", "/tmp/cargoo_storage_state")
+# Saved state older than this is ignored and a fresh session is built
+STORAGE_STATE_TTL = float(os.getenv("STORAGE_STATE_TTL", "43200"))
+
+# Text that carrier WAFs show instead of the tracking page
+BLOCK_MARKERS = (
+    "access blocked",
+    "access denied",
+    "request unsuccessful",
+    "you have been blocked",
+    "verify you are human",
+    "are you a robot",
+)
+
+
+def looks_blocked(content: str) -> bool:
+    """True if a page's text/HTML looks like a WAF block or challenge page."""
+    if not content:
+        return False
+    lowered = content.lower()
+    return any(marker in lowered for marker in BLOCK_MARKERS)
+
+
+class StorageStateStore:
+    """
+    Saves each carrier's storage state after a successful run and hands it
+    to new contexts. State expires after STORAGE_STATE_TTL and is dropped
+    as soon as a block is detected, since the cookies are then suspect.
+    """
+
+    def __init__(self, directory: str, ttl: float):
+        self.directory = directory
+        self.ttl = ttl
+        self._states = {}   # carrier -> (saved_at, state)
+        self.restores = 0
+        self.saves = 0
+        self.invalidations = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, carrier: str) -> str:
+        return os.path.join(self.directory, f"{carrier}.json")
+
+    def load(self, carrier: str):
+        """Returns the saved state for `carrier`, or None if missing/expired."""
+        if carrier not in self._states:
+            try:
+                with open(self._path(carrier)) as f:
+                    saved = json.load(f)
+                self._states[carrier] = (saved["saved_at"], saved["state"])
+            except (OSError, ValueError, KeyError):
+                return None
+
+        saved_at, state = self._states[carrier]
+        if time.time() - saved_at > self.ttl:
+            self.invalidate(carrier, "expired")
+            return None
+        self.restores += 1
+        return state
+
+    async def save(self, carrier: str, context):
+        try:
+            state = await context.storage_state()
+        except Exception as e:
+            print(f"   ⚠️ Storage state: could not read {carrier} session: {e}")
+            return
+        saved_at = time.time()
+        self._states[carrier] = (saved_at, state)
+        tmp_path = self._path(carrier) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"saved_at": saved_at, "state": state}, f)
+        os.replace(tmp_path, self._path(carrier))
+        self.saves += 1
+
+    def invalidate(self, carrier: str, reason: str):
+        had_state = self._states.pop(carrier, None) is not None
+        try:
+            os.remove(self._path(carrier))
+            had_state = True
+        except OSError:
+            pass
+        if had_state:
+            self.invalidations += 1
+            print(f"   🧹 Storage state: dropped {carrier} session ({reason})")
+
+    def stats(self):
+        now = time.time()
+        return {
+            "restores": self.restores,
+            "saves": self.saves,
+            "invalidations": self.invalidations,
+            "carriers": {
+                carrier: {"age_seconds": round(now - saved_at, 1)}
+                for carrier, (saved_at, _) in self._states.items()
+            },
+        }
+
+
+storage_states = StorageStateStore(STORAGE_STATE_DIR, STORAGE_STATE_TTL)
@@ -0,0 +1,51 @@
+from typing import Dict, List, Optional
+
+from services.date_utils import standardize_date, calculate_date_difference
+from services.holiday_utils import format_holidays_for_summary
+
+
+def _days(n: int) -> str:
+    return f"{n} day" if n == 1 else f"{n} days"
+
+
+def eta_delta_text(system_eta: str, live_eta: str) -> Optional[str]:
+    """'3 days later than planned (15/01/2026)', or None without a usable system ETA."""
+    delta = calculate_date_difference(system_eta, live_eta)
+    if delta is None:
+        return None
+    planned = standardize_date(system_eta)
+    if delta > 0:
+        return f"{_days(delta)} later than planned ({planned})"
+    if delta < 0:
+        return f"{_days(-delta)} earlier than planned ({planned})"
+    return f"same day as planned ({planned})"
+
+
+def shipment_summary(shipment: dict, system_eta: str, live_eta: str,
+                     holidays: Optional[Dict[str, List[str]]] = None) -> str:
+    """
+    Summary for structured Cargoes Flow data (the dict built by
+    cargoes_flow.extract_shipment), without an LLM call.
+
+    e.g. "Vessel Departure from Nhava Sheva to Antwerp. ETA 18/01/2026,
+    3 days later than planned (15/01/2026). No public holidays between the dates."
+    """
+    shipment = shipment if isinstance(shipment, dict) else {}
+    event = shipment.get("latest_event") or "In Transit"
+    origin = shipment.get("origin")
+    destination = shipment.get("destination")
+
+    route = event
+    if origin and destination:
+        route = f"{event} from {origin} to {destination}"
+    elif destination:
+        route = f"{event} to {destination}"
+
+    eta = standardize_date(live_eta)
+    if eta == "N/A":
+        return f"{route}. ETA not available."
+
+    delta = eta_delta_text(system_eta, live_eta)
+    eta_part = f"ETA {eta}, {delta}" if delta else f"ETA {eta}"
+    holidays_part = format_holidays_for_summary(holidays or {"french": [], "india": []})
+    return f"{route}. {eta_part}. {holidays_part.rstrip('.')}."
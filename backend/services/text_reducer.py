@@ -0,0 +1,151 @@
+import os
+import re
+import json
+
+from services.eta_extractors import find_dates
+
+# Prompt budget for the raw carrier text, in (estimated) tokens
+PARSE_TOKEN_BUDGET = int(os.getenv("PARSE_TOKEN_BUDGET", "1000"))
+# No tokenizer dependency: ~4 characters per token is close enough for budgeting
+CHARS_PER_TOKEN = 4
+
+ETA_WORDS = re.compile(r"\beta\b|arriv|discharg|estimated|\bpod\b|final|destination|delivered", re.IGNORECASE)
+EVENT_WORDS = re.compile(
+    r"vessel|voyage|\bvoy\b|port|terminal|transship|load|depart|gate|empty|full|"
+    r"\bpol\b|rail|barge|berth|container|status|event|location",
+    re.IGNORECASE
+)
+NOISE_WORDS = re.compile(
+    r"cookie|privacy|consent|log ?in|sign (in|up)|subscribe|newsletter|copyright|©|"
+    r"all rights reserved|terms of use|contact us|follow us|menu|javascript",
+    re.IGNORECASE
+)
+# Table rows: tab or pipe separated, or several columns split by runs of spaces
+TABLE_ROW = re.compile(r"\t|\|| {2,}\S+ {2,}")
+
+# Lines this long without a date are prose (terms, marketing), not events
+LONG_LINE = 300
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _lines(raw_text: str):
+    """Lines of the text; captured API JSON is re-indented so each value gets its own line."""
+    stripped = raw_text.lstrip()
+    if stripped[:1] in "{[":
+        try:
+            return json.dumps(json.loads(raw_text), indent=1, ensure_ascii=False).splitlines()
+        except ValueError:
+            pass
+    return raw_text.splitlines()
+
+
+def score_line(line: str) -> float:
+    score = 0.0
+    has_date = bool(find_dates(line))
+    if has_date:
+        score += 3
+    if ETA_WORDS.search(line):
+        score += 3 if has_date else 1.5
+    if EVENT_WORDS.search(line):
+        score += 1
+    if TABLE_ROW.search(line):
+        score += 1
+    if NOISE_WORDS.search(line):
+        score -= 3
+    if len(line) > LONG_LINE and not has_date:
+        score -= 2
+    return score
+
+
+def reduce_raw_text(raw_text: str, budget_tokens: int = PARSE_TOKEN_BUDGET):
+    """
+    Keeps the event timeline of a carrier page within `budget_tokens`.
+
+    Lines are scored on dates, ETA/port/vessel keywords and table structure;
+    navigation, cookie text and footers score negative. Lines next to a
+    dated line are always kept with it (place names and event labels of
+    vertical tables sit above or below the date), repeated lines elsewhere
+    are dropped, and if the result is still over budget the weakest lines
+    go first. Original order is preserved.
+    Returns (text, tokens_before, tokens_after).
+    """
+    before = estimate_tokens(raw_text)
+    if before <= budget_tokens:
+        return raw_text, before, before
+
+    lines = [line.strip() for line in _lines(raw_text)]
+    lines = [line for line in lines if line]
+    scores = [score_line(line) for line in lines]
+    anchors = [score >= 3 for score in scores]
+
+    def protected(i):
+        return any(0 <= j < len(lines) and anchors[j] for j in (i - 1, i + 1))
+
+    keep = [score > 0 or protected(i) for i, score in enumerate(scores)]
+
+    # Repeated lines (menus, column headings) only count once unless they
+    # belong to a dated row
+    seen = set()
+    for i, line in enumerate(lines):
+        if not keep[i] or anchors[i] or protected(i):
+            continue
+        if line in seen:
+            keep[i] = False
+        seen.add(line)
+
+    selected = [i for i in range(len(lines)) if keep[i]]
+    if not selected:
+        text = raw_text[:budget_tokens * CHARS_PER_TOKEN]
+        return text, before, estimate_tokens(text)
+
+    budget_chars = budget_tokens * CHARS_PER_TOKEN
+    used = sum(len(lines[i]) + 1 for i in selected)
+    # Drop the weakest (and, among equals, the earliest) lines first. A line
+    # next to a kept date goes only after that date has gone.
+    while used > budget_chars:
+        dropped = False
+        for i in sorted(selected, key=lambda i: (scores[i], i)):
+            if used <= budget_chars:
+                break
+            if not keep[i]:
+                continue
+            if not anchors[i] and any(0 <= j < len(lines) and anchors[j] and keep[j] for j in (i - 1, i + 1)):
+                continue
+            keep[i] = False
+            used -= len(lines[i]) + 1
+            dropped = True
+        selected = [i for i in selected if keep[i]]
+        if not dropped:
+            break
+
+    text = "\n".join(lines[i] for i in selected)[:budget_chars]
+    return text, before, estimate_tokens(text)
+
+
+class ReductionStats:
+    def __init__(self):
+        self.calls = 0
+        self.reduced = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def record(self, before: int, after: int):
+        self.calls += 1
+        self.reduced += after < before
+        self.tokens_before += before
+        self.tokens_after += after
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "reduced": self.reduced,
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "tokens_saved": self.tokens_before - self.tokens_after,
+        }
+
+
+reduction_stats = ReductionStats()
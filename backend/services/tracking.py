@@ -0,0 +1,362 @@
+import os
+import time
+import asyncio
+
+from services.cargoes_flow import get_sea_shipment, to_sea_shipment
+from services.cargoes_mirror import cargoes_mirror
+from services.ai_service import parse_tracking_data
+from services.date_utils import standardize_date, dates_are_equal, get_date_range
+from services.holiday_utils import get_holidays_between_dates, format_holidays_for_summary
+from services.summaries import shipment_summary
+from services.singleflight import SingleFlight
+from services.cache import TTLCache
+from services.history import history
+from services.behaviour import profile_for, use_profile, profile_timings
+from services.batch_parser import batching
+
+# --- SEA DRIVERS ---
+from services.sea.msc import drive_msc
+from services.sea.hapag import drive_hapag
+from services.sea.cma import drive_cma
+from services.sea.hmm import drive_hmm
+from services.sea.evergreen import drive_evergreen
+
+# Concurrency caps per tier. Each tier has very different costs:
+# the API is cheap, every driver is a full Chromium, and AI calls are rate limited.
+API_CONCURRENCY = int(os.getenv("TRACK_API_CONCURRENCY", "20"))
+DRIVER_CONCURRENCY = int(os.getenv("TRACK_DRIVER_CONCURRENCY", "3"))
+AI_CONCURRENCY = int(os.getenv("TRACK_AI_CONCURRENCY", "8"))
+
+api_semaphore = asyncio.Semaphore(API_CONCURRENCY)
+driver_semaphore = asyncio.Semaphore(DRIVER_CONCURRENCY)
+ai_semaphore = asyncio.Semaphore(AI_CONCURRENCY)
+
+# Duplicate containers (shared across bookings) ride along on one lookup
+lookups = SingleFlight("Lookup")
+
+# Lookup results per container+carrier. API data goes stale sooner than a
+# scraped page, and stale entries are served while a refresh runs.
+RESULT_TTL_API = float(os.getenv("RESULT_TTL_API", "900"))
+RESULT_TTL_DRIVER = float(os.getenv("RESULT_TTL_DRIVER", "21600"))
+RESULT_STALE_WINDOW = float(os.getenv("RESULT_STALE_WINDOW", "86400"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "5000"))
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "")
+
+result_cache = TTLCache(
+    "Results",
+    max_entries=RESULT_CACHE_MAX_ENTRIES,
+    stale_window=RESULT_STALE_WINDOW,
+    disk_path=RESULT_CACHE_PATH
+)
+RESULT_TTLS = {"cargoes_flow": RESULT_TTL_API, "driver": RESULT_TTL_DRIVER}
+
+# When set, every driver's raw output is saved here as a corpus for
+# scripts/eval_extractors.py
+DRIVER_CORPUS_DIR = os.getenv("DRIVER_CORPUS_DIR", "")
+
+# Keeps background refresh tasks referenced until they finish
+_refresh_tasks = set()
+
+
+async def _fetch_api(number: str):
+    # The local mirror answers without a network call; the live API
+    # covers containers it hasn't seen yet.
+    mirrored = cargoes_mirror.lookup(normalize_container(number))
+    if mirrored:
+        print(f"   🪞 Mirror hit for {number}. ETA: {mirrored.get('eta_raw')}")
+        return to_sea_shipment(mirrored)
+
+    async with api_semaphore:
+        return await get_sea_shipment(number)
+
+
+async def _run_driver(number: str, carrier_name: str, profile: str = None):
+    """
+    Routes the container to the matching official driver (if any), run
+    with the requested behaviour profile or the carrier's default one.
+    """
+    if "msc" in carrier_name:
+        name, driver = "msc", drive_msc
+    elif "hapag" in carrier_name:
+        name, driver = "hapag", drive_hapag
+    elif "cma" in carrier_name:
+        name, driver = "cma", drive_cma
+    elif "hmm" in carrier_name or "hyundai" in carrier_name:
+        name, driver = "hmm", drive_hmm
+    elif "evergreen" in carrier_name or "ever" in carrier_name:
+        name, driver = "evergreen", drive_evergreen
+    else:
+        return None
+
+    behaviour = profile_for(name, profile)
+    async with driver_semaphore:
+        with use_profile(behaviour):
+            started = time.monotonic()
+            result = await driver(number)
+        elapsed = time.monotonic() - started
+        profile_timings.record(name, behaviour.name, elapsed, bool(result and result.get("raw_data")))
+        print(f"   ⏱️ {name} driver ({behaviour.name} profile) took {elapsed:.1f}s")
+
+    if DRIVER_CORPUS_DIR and result and result.get("raw_data"):
+        _save_to_corpus(name, number, result["raw_data"])
+    return result
+
+
+def _save_to_corpus(carrier: str, number: str, raw_data: str):
+    try:
+        os.makedirs(DRIVER_CORPUS_DIR, exist_ok=True)
+        path = os.path.join(DRIVER_CORPUS_DIR, f"{carrier}_{normalize_container(number)}_{int(time.time())}.txt")
+        with open(path, "w") as f:
+            f.write(raw_data)
+    except OSError as e:
+        print(f"   ⚠️ Could not save driver output to corpus: {e}")
+
+
+async def _parse(raw_text: str, carrier: str, **kwargs):
+    async with ai_semaphore:
+        return await parse_tracking_data(raw_text, carrier, **kwargs)
+
+
+def normalize_container(number: str) -> str:
+    return number.replace(" ", "").replace("-", "").strip().upper()
+
+
+def lookup_key(number: str, carrier: str):
+    return (normalize_container(number), carrier.strip().lower())
+
+
+async def _lookup(number: str, carrier: str, profile: str = None):
+    """
+    The expensive, caller-independent part of tracking: Cargoes Flow,
+    then the official driver plus a first AI parse of its raw text.
+    Returns a snapshot dict with the `tier` that answered (or None).
+    """
+    # ---------------------------------------------------------
+    # TIER 1: CARGOES FLOW API (The Fast Lane)
+    # ---------------------------------------------------------
+    data = await _fetch_api(number)
+    if data:
+        return {"tier": "cargoes_flow", "data": data}
+
+    # CMA fallback: if Cargoes Flow has no data, skip browser driver
+    carrier_name = carrier.lower()
+    if "cma" in carrier_name:
+        print("   ⚠️ CMA not in Cargoes Flow. Skipping driver; manual check required.")
+        return {"tier": None}
+
+    # ---------------------------------------------------------
+    # TIER 2: OFFICIAL DRIVERS (The Custom Scripts)
+    # ---------------------------------------------------------
+    print("   🐢 API didn't have data. Switching to Official Driver...")
+
+    scrape_data = await _run_driver(number, carrier_name, profile)
+    if not (scrape_data and scrape_data.get("raw_data")):
+        return {"tier": None}
+
+    print("   🧠 Sending raw text to AI for analysis...")
+
+    # First, get basic parsing to extract live ETA
+    ai_result = await _parse(
+        scrape_data["raw_data"],
+        carrier,
+        live_eta="Extracting...",
+        holidays_info="Calculating..."
+    )
+    return {"tier": "driver", "scrape_data": scrape_data, "ai_result": ai_result}
+
+
+async def _lookup_and_cache(key, number: str, carrier: str, profile: str = None):
+    container = key[0]
+
+    # A stored snapshot younger than its tier TTL is as good as a live lookup
+    latest = history.latest(container)
+    if latest:
+        ttl = RESULT_TTLS[latest["source"]]
+        age = time.time() - latest["observed_at"]
+        if age < ttl:
+            print(f"   🗄️ Answering {container} from history ({int(age)}s old)")
+            result_cache.set(key, latest["snapshot"], ttl - age)
+            return latest["snapshot"]
+
+    snapshot = await _lookup(number, carrier, profile)
+    # "Not found" is not cached: the driver may simply have failed this time
+    if snapshot["tier"]:
+        result_cache.set(key, snapshot, RESULT_TTLS[snapshot["tier"]])
+        history.record(container, carrier, snapshot)
+    return snapshot
+
+
+def _refresh_in_background(key, number: str, carrier: str, profile: str = None):
+    async def _refresh():
+        try:
+            await lookups.do(key, lambda: _lookup_and_cache(key, number, carrier, profile))
+        except Exception as e:
+            print(f"   ⚠️ Background refresh failed for {number}: {e}")
+
+    task = asyncio.create_task(_refresh())
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+async def _build_response(snapshot: dict, number: str, carrier: str, system_eta: str):
+    """Turns a shared lookup snapshot into this caller's response (ETA diff, summary)."""
+    carrier_name = carrier.lower()
+
+    if snapshot["tier"] == "cargoes_flow":
+        data = snapshot["data"]
+        live_eta = data.get("eta", "N/A")
+        co2 = data.get("co2", "N/A")
+        status = data.get("status")
+        sub_status = data.get("sub_status", "")
+
+        # Compare ETAs
+        eta_changed = not dates_are_equal(system_eta, live_eta)
+
+        # Holidays between the two ETAs if it changed
+        holidays = None
+        if eta_changed:
+            start_date, end_date = get_date_range(system_eta, live_eta)
+            if start_date and end_date:
+                holidays = get_holidays_between_dates(start_date, end_date)
+
+        # The data is already structured: a template summary replaces the
+        # LLM call (which stays reserved for unstructured driver text)
+        if eta_changed and data.get("raw_data"):
+            smart_summary = shipment_summary(data.get("raw_data"), system_eta, live_eta, holidays)
+        else:
+            # Simple summary for unchanged ETA
+            smart_summary = f"Status: {sub_status}" if sub_status else f"Status: {status}"
+
+        return {
+            "tracking_number": number,
+            "carrier": carrier,
+            "status": status,
+            "live_eta": live_eta,
+            "co2": co2,
+            "eta_changed": eta_changed,
+            "smart_summary": smart_summary,
+            "raw_data_snippet": "Source: Cargoes Flow API"
+        }
+
+    # ---------------------------------------------------------
+    # AI PARSING & RESPONSE
+    # ---------------------------------------------------------
+    if snapshot["tier"] == "driver":
+        scrape_data = snapshot["scrape_data"]
+        ai_result = snapshot["ai_result"]
+
+        # Standardize system ETA if provided
+        system_eta_standardized = standardize_date(system_eta)
+
+        live_eta = standardize_date(ai_result.get("latest_date", "N/A"))
+        co2 = ai_result.get("co2", "N/A")
+
+        # Compare ETAs
+        eta_changed = not dates_are_equal(system_eta, live_eta)
+
+        # Calculate holidays if ETA changed
+        holidays_info = "No holidays between dates"
+        if eta_changed:
+            start_date, end_date = get_date_range(system_eta, live_eta)
+            if start_date and end_date:
+                holidays = get_holidays_between_dates(start_date, end_date)
+                holidays_info = format_holidays_for_summary(holidays)
+
+                # Re-generate summary with holiday info if ETA changed
+                print("   🧠 ETA changed - regenerating summary with holiday info...")
+                ai_result = await _parse(
+                    scrape_data["raw_data"],
+                    carrier,
+                    system_eta=system_eta_standardized,
+                    live_eta=live_eta,
+                    holidays_info=holidays_info
+                )
+
+        return {
+            "tracking_number": number,
+            "carrier": carrier,
+            "status": ai_result.get("status"),
+            "live_eta": live_eta,
+            "co2": co2,
+            "eta_changed": eta_changed,
+            "smart_summary": ai_result.get("summary"),
+            "raw_data_snippet": "Source: Official Driver"
+        }
+
+    # If API failed AND Driver failed/doesn't exist
+    # Provide helpful message based on carrier
+    if "cma" in carrier_name:
+        message = "CMA CGM container not found in Cargoes Flow API. Please check manually at: https://www.cma-cgm.com/ebusiness/tracking"
+    else:
+        message = "Container not found in API, and no Official Driver available."
+
+    return {
+        "source": "System",
+        "status": "Manual Check Required" if "cma" in carrier_name else "Not Found",
+        "co2": "N/A",
+        "eta_changed": False,
+        "message": message
+    }
+
+
+async def track_container(number: str, carrier: str = "Unknown", system_eta: str = "N/A", profile: str = None):
+    """
+    Full tracking pipeline for a single sea container.
+    Tier 1 is the Cargoes Flow API, Tier 2 the official carrier drivers,
+    with AI parsing on top. Each tier is bounded by its own semaphore so
+    many containers can be tracked concurrently, and concurrent lookups of
+    the same container+carrier share a single in-flight run.
+
+    Results are cached per tier TTL; a stale entry is answered immediately
+    (flagged `stale`) while a refresh runs in the background.
+    `profile` picks the driver behaviour profile (see services/behaviour.py).
+    """
+    key = lookup_key(number, carrier)
+    stale = False
+
+    cached = result_cache.get(key)
+    if cached:
+        snapshot = cached.value
+        if not cached.fresh:
+            stale = True
+            print(f"   ♻️ Serving stale result for {number}, refreshing in background...")
+            _refresh_in_background(key, number, carrier, profile)
+    else:
+        snapshot = await lookups.do(key, lambda: _lookup_and_cache(key, number, carrier, profile))
+
+    response = await _build_response(snapshot, number, carrier, system_eta)
+    response["stale"] = stale
+    return response
+
+
+async def track_many(requests):
+    """
+    Tracks a list of (number, carrier, system_eta, profile) tuples concurrently.
+    Yields (index, result) pairs in completion order, not input order.
+    """
+    async def _run(index, number, carrier, system_eta, profile):
+        try:
+            with batching():
+                result = await track_container(number, carrier, system_eta, profile)
+        except Exception as e:
+            print(f"   ❌ Tracking failed for {number}: {e}")
+            result = {
+                "tracking_number": number,
+                "carrier": carrier,
+                "status": "Error",
+                "eta_changed": False,
+                "message": str(e)
+            }
+        return index, result
+
+    tasks = [
+        asyncio.create_task(_run(i, number, carrier, system_eta, profile))
+        for i, (number, carrier, system_eta, profile) in enumerate(requests)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client disconnected mid-stream: don't leave orphaned browsers running
+        for task in tasks:
+            task.cancel()
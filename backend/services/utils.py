@@ -1,6 +1,7 @@
 import asyncio
 import random
 import os
+from services.behaviour import current_profile
 
 # Enhanced Stealth Args to make Headless Chrome look like a real browser
 STEALTH_ARGS = [
@@ -94,10 +95,10 @@ def get_proxy_config():
     return None
 
 
-async def create_stealth_context(browser):
+def get_stealth_context_options():
     """
-    Create a browser context with realistic fingerprinting to avoid detection.
-    Includes proper headers, viewport, locale, and navigator overrides.
+    Context options with realistic fingerprinting to avoid detection:
+    proper headers, viewport, locale and (optional) proxy.
     """
     proxy_config = get_proxy_config()
     
@@ -127,17 +128,20 @@ async def create_stealth_context(browser):
     if proxy_config:
         context_options["proxy"] = proxy_config
     
-    context = await browser.new_context(**context_options)
-    
-    # Inject stealth scripts to remove automation detection
+    return context_options
+
+
+async def apply_stealth(context):
+    """Inject stealth scripts to remove automation detection."""
     await context.add_init_script(STEALTH_INIT_SCRIPT)
-    
-    return context
 
 
 async def human_delay(min_ms=1000, max_ms=3000):
-    """Add random human-like delays between actions"""
-    delay = random.randint(min_ms, max_ms) / 1000
+    """Add random human-like delays between actions (scaled by the behaviour profile)"""
+    scale = current_profile().delay_scale
+    if not scale:
+        return
+    delay = random.randint(min_ms, max_ms) / 1000 * scale
     await asyncio.sleep(delay)
 
 
@@ -146,6 +150,8 @@ async def human_mouse_movement(page):
     Simulate human-like mouse movements across the page.
     Moves cursor to random positions with natural pauses.
     """
+    if not current_profile().mouse:
+        return
     for _ in range(random.randint(2, 5)):
         x = random.randint(100, 1800)
         y = random.randint(100, 900)
@@ -161,6 +167,8 @@ async def human_scroll(page, direction="down", amount=None):
         direction: "down" or "up"
         amount: Scroll amount in pixels (random if None)
     """
+    if not current_profile().scroll:
+        return
     if amount is None:
         amount = random.randint(200, 500)
     
@@ -183,6 +191,8 @@ async def random_viewport_scroll(page):
     Perform random scrolling to simulate natural browsing behavior.
     Scrolls down and optionally back up a bit.
     """
+    if not current_profile().scroll:
+        return
     # Scroll down
     await human_scroll(page, "down", random.randint(300, 600))
     await asyncio.sleep(random.uniform(0.5, 1.5))
@@ -196,9 +206,19 @@ async def human_type(page, selector, text):
     """
     Robust Typing: Clears field, types slowly, and VERIFIES the result.
     If typing fails (jumbled), it retries.
+    The behaviour profile sets the per-character delay; `fast` skips
+    typing entirely and fills the value with input/change events.
     """
+    profile = current_profile()
     element = page.locator(selector)
     await element.wait_for(state="visible")
+
+    if profile.instant_fill:
+        await element.fill(text)
+        await element.dispatch_event("input")
+        await element.dispatch_event("change")
+        return
+
     await element.highlight()
 
     # Retry loop in case of jumbled text
@@ -211,13 +231,14 @@ async def human_type(page, selector, text):
             # await element.press("Control+A") 
             # await element.press("Backspace")
 
-            # 2. Type Slowly (Increased delay to 150-300ms)
+            # 2. Type Slowly (150-300ms per char in the stealth profile)
+            min_delay, max_delay = profile.type_delay_ms
             for char in text:
-                await element.type(char, delay=random.randint(150, 300))
+                await element.type(char, delay=random.randint(min_delay, max_delay))
             
             # 3. Verify
             # Allow a tiny moment for JS to settle
-            await asyncio.sleep(0.5)
+            await asyncio.sleep(profile.verify_pause)
             current_value = await element.input_value()
             
             # Remove spaces/dashes for comparison
@@ -237,24 +258,3 @@ async def human_type(page, selector, text):
     # If all attempts fail, try the brute-force 'fill' (instant paste)
     print("   ⚠️ Typing failed. Attempting brute-force fill...")
     await element.fill(text)
-
-async def kill_cookie_banners(page):
-    """Clicks 'Accept', 'Allow', or 'Agree' buttons."""
-    try:
-        # Common selectors for cookie consent
-        selectors = [
-            "#onetrust-accept-btn-handler",
-            "button:has-text('Accept All')",
-            "button:has-text('Allow all')",
-            "button:has-text('I Agree')",
-            "button:has-text('Agree')",
-            ".cc-btn.cc-accept"
-        ]
-        for sel in selectors:
-            if await page.locator(sel).first.is_visible(timeout=2000):
-                print("   🍪 Cookie banner detected. Clicking...")
-                await page.locator(sel).first.click()
-                await asyncio.sleep(1) # Wait for banner to disappear
-                return
-    except:
-        pass
\ No newline at end of file
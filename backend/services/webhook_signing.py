@@ -0,0 +1,22 @@
+import os
+import hmac
+import hashlib
+
+# Standard library only: scripts/replay_cargoes_webhooks.py imports this
+# without pulling in the tracking stack.
+WEBHOOK_SECRET = os.getenv("CARGOES_FLOW_WEBHOOK_SECRET", "").strip()
+WEBHOOK_SIGNATURE_HEADER = os.getenv("CARGOES_FLOW_WEBHOOK_SIGNATURE_HEADER", "X-Cargoes-Signature")
+
+
+def sign_payload(body: bytes, secret: str = WEBHOOK_SECRET) -> str:
+    return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body: bytes, signature: str) -> bool:
+    """HMAC-SHA256 of the raw body; accepts both `sha256=<hex>` and bare hex."""
+    if not WEBHOOK_SECRET or not signature:
+        return False
+    expected = sign_payload(body, WEBHOOK_SECRET)
+    if not signature.startswith("sha256="):
+        signature = "sha256=" + signature
+    return hmac.compare_digest(expected, signature.strip().lower())
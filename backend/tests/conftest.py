@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tests import the backend the way main.py does ("from services...")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# The OpenAI client is built at import time; no test talks to the API
+os.environ.setdefault("OPENAI_API_KEY", "test")
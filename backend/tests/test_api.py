@@ -0,0 +1,16 @@
+from fastapi.testclient import TestClient
+
+import main
+
+# No `with`: the lifespan (browsers, mirror, job workers) is not started
+client = TestClient(main.app)
+
+
+def test_unknown_profile_is_rejected():
+    response = client.post("/api/track/sea", json={"number": "MSCU1234567", "profile": "stealthy"})
+    assert response.status_code == 422
+
+
+def test_job_request_rejects_unknown_profile():
+    response = client.post("/api/jobs", json=[{"number": "MSCU1234567", "profile": "turbo"}])
+    assert response.status_code == 422
@@ -0,0 +1,72 @@
+import asyncio
+
+from services.batch_parser import BatchParser, batching, batching_enabled
+
+
+def answer(key):
+    return {"latest_date": "18-Jan-2026", "status": "In Transit", "summary": key}
+
+
+def make_parser(reply, **limits):
+    sent = []
+
+    async def send(items):
+        sent.append([key for key, _, _ in items])
+        return reply(items)
+
+    return BatchParser(send, **{"window": 0.02, "max_tokens": 6000, "max_items": 8, **limits}), sent
+
+
+def run_parses(parser, texts):
+    async def run():
+        return await asyncio.gather(*[parser.parse(text, "MSC") for text in texts])
+    return asyncio.run(run())
+
+
+def test_concurrent_parses_share_one_request():
+    parser, sent = make_parser(lambda items: {key: answer(key) for key, _, _ in items})
+    results = run_parses(parser, ["a", "b", "c"])
+    assert [r["summary"] for r in results] == ["c1", "c2", "c3"]
+    assert sent == [["c1", "c2", "c3"]]
+    assert parser.stats()["avg_batch_size"] == 3
+
+
+def test_a_lone_parse_makes_its_own_call():
+    parser, sent = make_parser(lambda items: {})
+    assert run_parses(parser, ["a"]) == [None]
+    assert sent == []
+    assert parser.stats()["solo"] == 1
+
+
+def test_item_and_token_limits_split_batches():
+    parser, sent = make_parser(lambda items: {key: answer(key) for key, _, _ in items}, max_items=2)
+    run_parses(parser, ["a", "b", "c", "d"])
+    assert sent == [["c1", "c2"], ["c1", "c2"]]
+
+    parser, sent = make_parser(lambda items: {key: answer(key) for key, _, _ in items}, max_tokens=10)
+    run_parses(parser, ["x" * 24, "x" * 24, "x" * 24])
+    assert all(len(batch) <= 2 for batch in sent)
+
+
+def test_malformed_entries_fall_back():
+    parser, _ = make_parser(lambda items: {"c1": answer("c1"), "c2": "oops"})
+    first, second = run_parses(parser, ["a", "b"])
+    assert first["summary"] == "c1"
+    assert second is None
+    assert parser.stats()["fallbacks"] == 1
+
+
+def test_failed_request_falls_back_for_everyone():
+    def fail(items):
+        raise ValueError("bad JSON")
+
+    parser, _ = make_parser(fail)
+    assert run_parses(parser, ["a", "b"]) == [None, None]
+    assert parser.stats()["fallbacks"] == 2
+
+
+def test_batching_context():
+    assert not batching_enabled()
+    with batching():
+        assert batching_enabled()
+    assert not batching_enabled()
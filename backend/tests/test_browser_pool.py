@@ -0,0 +1,34 @@
+import asyncio
+
+from services import browser_pool as bp
+from services.browser_pool import BrowserPool, PooledBrowser
+
+
+class FakeBrowser:
+    def is_connected(self):
+        return True
+
+
+def launches(monkeypatch, headless, busy, **limits):
+    for name, value in limits.items():
+        monkeypatch.setattr(bp, name, value)
+    pool = BrowserPool()
+
+    async def fake_launch(headless, args):
+        return PooledBrowser(FakeBrowser())
+
+    pool._launch = fake_launch
+
+    async def run():
+        return [await pool._acquire_browser(headless, ()) for _ in range(busy)]
+
+    return len({id(b) for b in asyncio.run(run())})
+
+
+def test_headful_browsers_spread_over_displays(monkeypatch):
+    assert launches(monkeypatch, False, 4, BROWSER_MAX_HEADFUL_PROCESSES=4, BROWSER_HEADFUL_CONTEXTS_PER_PROCESS=1) == 4
+    assert launches(monkeypatch, False, 6, BROWSER_MAX_HEADFUL_PROCESSES=4, BROWSER_HEADFUL_CONTEXTS_PER_PROCESS=1) == 4
+
+
+def test_headless_browsers_share_processes(monkeypatch):
+    assert launches(monkeypatch, True, 4, BROWSER_MAX_PROCESSES=2, BROWSER_CONTEXTS_PER_PROCESS=3) == 2
@@ -0,0 +1,53 @@
+import time
+
+from services.cache import TTLCache
+
+
+def test_hit_miss_and_expiry():
+    cache = TTLCache("test")
+    cache.set(("MSCU1", "msc"), {"eta": "18/01/2026"}, ttl=60)
+    assert cache.get(("MSCU1", "msc")).value == {"eta": "18/01/2026"}
+    assert cache.get(("MSCU2", "msc")) is None
+
+    cache.set("short", 1, ttl=0)
+    time.sleep(0.01)
+    assert cache.get("short") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_stale_entries_within_the_window():
+    cache = TTLCache("test", stale_window=60)
+    cache.set("key", "value", ttl=0)
+    time.sleep(0.01)
+    entry = cache.get("key")
+    assert entry.value == "value"
+    assert not entry.fresh
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_lru_bound():
+    cache = TTLCache("test", max_entries=2)
+    cache.set("a", 1, 60)
+    cache.set("b", 2, 60)
+    cache.get("a")
+    cache.set("c", 3, 60)
+    assert cache.get("b") is None
+    assert cache.get("a").value == 1
+
+
+def test_delete_prefix():
+    cache = TTLCache("test")
+    cache.set(("MSCU1", "msc"), 1, 60)
+    cache.set(("MSCU1", "hapag"), 2, 60)
+    cache.set(("MSCU10", "msc"), 3, 60)
+    cache.delete_prefix(("MSCU1",))
+    assert cache.get(("MSCU1", "msc")) is None
+    assert cache.get(("MSCU1", "hapag")) is None
+    assert cache.get(("MSCU10", "msc")).value == 3
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    TTLCache("test", disk_path=path).set("key", {"eta": "18/01/2026"}, 60)
+    assert TTLCache("test", disk_path=path).get("key").value == {"eta": "18/01/2026"}
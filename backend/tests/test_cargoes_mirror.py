@@ -0,0 +1,82 @@
+import time
+import asyncio
+import sqlite3
+
+import httpx
+import pytest
+
+from services import cargoes_mirror
+from services.cargoes_mirror import CargoesMirror
+
+
+def shipment(container, updated_at, eta="2026-01-18"):
+    return {
+        "containerNumber": container,
+        "updatedAt": updated_at,
+        "shipmentLegs": {"portToPort": {"lastPort": "ANTWERP", "destinationOceanPortEta": eta}},
+    }
+
+
+@pytest.fixture
+def mirror(tmp_path, monkeypatch):
+    pages = []
+    requests = []
+
+    async def fake_api_get(params):
+        requests.append(params)
+        return httpx.Response(200, json=pages.pop(0) if pages else [])
+
+    monkeypatch.setattr(cargoes_mirror, "api_get", fake_api_get)
+    monkeypatch.setattr(cargoes_mirror, "MIRROR_PAGE_SIZE", 2)
+    m = CargoesMirror(str(tmp_path / "mirror.db"))
+    m._db = sqlite3.connect(m.db_path, check_same_thread=False)
+    m._db.executescript(cargoes_mirror.SCHEMA)
+    return m, pages, requests
+
+
+def test_first_sync_is_full_then_delta(mirror):
+    m, pages, requests = mirror
+    pages.append([shipment("MSCU1", "2026-01-01T00:00:00Z"), shipment("MSCU2", "2026-01-02T00:00:00Z")])
+    pages.append([])
+    asyncio.run(m.sync())
+    assert cargoes_mirror.MIRROR_DELTA_PARAM not in requests[0]
+    assert m.cursor == "2026-01-02T00:00:00Z"
+    assert m.lookup("MSCU1")["eta_raw"] == "2026-01-18"
+
+    requests.clear()
+    pages.append([shipment("MSCU2", "2026-01-03T00:00:00Z", eta="2026-01-20")])
+    asyncio.run(m.sync())
+    assert requests[0][cargoes_mirror.MIRROR_DELTA_PARAM] == "2026-01-02T00:00:00Z"
+    assert m.lookup("MSCU2")["eta_raw"] == "2026-01-20"
+    assert not m.delta_ignored
+
+
+def test_ignored_delta_filter_is_detected(mirror):
+    m, pages, _ = mirror
+    pages.append([shipment("MSCU1", "2026-01-02T00:00:00Z")])
+    asyncio.run(m.sync())
+    # The "delta" comes back with shipments older than the cursor
+    pages.append([shipment("MSCU0", "2025-12-01T00:00:00Z")])
+    asyncio.run(m.sync())
+    assert m.delta_ignored
+    assert m.stats()["delta_ignored"] is True
+
+
+def test_full_sync_runs_again_after_interval(mirror, monkeypatch):
+    m, pages, requests = mirror
+    pages.append([shipment("MSCU1", "2026-01-02T00:00:00Z")])
+    asyncio.run(m.sync())
+    monkeypatch.setattr(cargoes_mirror, "MIRROR_FULL_SYNC_INTERVAL", 0)
+    requests.clear()
+    asyncio.run(m.sync())
+    assert cargoes_mirror.MIRROR_DELTA_PARAM not in requests[0]
+
+
+def test_old_entries_fall_through_to_the_live_api(mirror, monkeypatch):
+    m, _, _ = mirror
+    m.upsert([shipment("MSCU1", "2026-01-02T00:00:00Z")])
+    assert m.lookup("MSCU1")
+    summary, _ = m._index["MSCU1"]
+    m._index["MSCU1"] = (summary, time.time() - cargoes_mirror.MIRROR_MAX_AGE - 1)
+    assert m.lookup("MSCU1") is None
+    assert m.expired_hits == 1
@@ -0,0 +1,70 @@
+import hmac
+import hashlib
+
+import pytest
+
+from services import cargoes_webhook, webhook_signing
+from services.cargoes_mirror import CargoesMirror
+from services.history import ShipmentHistory
+from services.tracking import result_cache, lookup_key
+from services.webhook_signing import sign_payload, verify_signature
+from services.cargoes_webhook import _shipments_from_payload
+
+BODY = b'{"containerNumber": "MSCU1234567"}'
+
+
+@pytest.fixture(autouse=True)
+def secret(monkeypatch):
+    monkeypatch.setattr(webhook_signing, "WEBHOOK_SECRET", "s3cret")
+
+
+def test_sign_payload_is_hmac_sha256():
+    digest = hmac.new(b"s3cret", BODY, hashlib.sha256).hexdigest()
+    assert sign_payload(BODY, "s3cret") == "sha256=" + digest
+
+
+def test_accepts_prefixed_and_bare_signatures():
+    signature = sign_payload(BODY, "s3cret")
+    assert verify_signature(BODY, signature)
+    assert verify_signature(BODY, signature[len("sha256="):])
+    assert verify_signature(BODY, signature.upper().replace("SHA256=", "sha256="))
+
+
+def test_rejects_bad_signatures():
+    assert not verify_signature(BODY, sign_payload(BODY, "other"))
+    assert not verify_signature(BODY + b" ", sign_payload(BODY, "s3cret"))
+    assert not verify_signature(BODY, "")
+
+
+def test_rejects_everything_without_a_secret(monkeypatch):
+    monkeypatch.setattr(webhook_signing, "WEBHOOK_SECRET", "")
+    assert not verify_signature(BODY, sign_payload(BODY, ""))
+
+
+def test_payload_shapes():
+    one = {"containerNumber": "A"}
+    assert _shipments_from_payload(one) == [one]
+    assert _shipments_from_payload({"data": [one, "junk"]}) == [one]
+    assert _shipments_from_payload({"shipments": {"shipment": one}}) == [one]
+    assert _shipments_from_payload("nope") == []
+
+
+def test_ingest_updates_mirror_and_history_and_drops_cached_results(tmp_path, monkeypatch):
+    mirror = CargoesMirror(str(tmp_path / "mirror.db"))
+    store = ShipmentHistory(str(tmp_path / "history.db"))
+    monkeypatch.setattr(cargoes_webhook, "cargoes_mirror", mirror)
+    monkeypatch.setattr(cargoes_webhook, "history", store)
+    key = lookup_key("MSCU1234567", "MSC")
+    result_cache.set(key, {"tier": "driver", "data": {}}, 60)
+
+    updated = cargoes_webhook.ingest({"data": [{
+        "containerNumber": "mscu 1234567",
+        "updatedAt": "2026-01-10T00:00:00Z",
+        "shipmentLegs": {"portToPort": {"lastPort": "ANTWERP", "destinationOceanPortEta": "2026-01-18"}},
+    }]})
+
+    assert updated == ["MSCU1234567"]
+    assert mirror.lookup("MSCU1234567")["destination"] == "ANTWERP"
+    latest = store.latest("MSCU1234567")
+    assert latest["snapshot"]["tier"] == "cargoes_flow"
+    assert result_cache.get(key) is None
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from services.eta_extractors import (
+    EXTRACTORS, EXTRACTOR_MIN_CONFIDENCE, extract_eta, extractor_for, find_dates
+)
+
+TODAY = datetime(2026, 1, 1)
+
+
+def extract(carrier, text):
+    return EXTRACTORS[carrier].extract(text, TODAY)
+
+
+def test_find_dates_formats():
+    text = "2026-01-18 | 18/01/2026 | 18-Jan-2026 | JAN-18-2026 | 31/02/2026"
+    assert [d for _, _, d in find_dates(text)] == [datetime(2026, 1, 18)] * 4
+
+
+def test_specific_label_is_confident():
+    result = extract("msc", "Shipment\nPOD ETA 18/01/2026\n")
+    assert result["latest_date"] == "18-Jan-2026"
+    assert result["status"] == "In Transit"
+    assert result["confidence"] >= EXTRACTOR_MIN_CONFIDENCE
+
+
+def test_generic_eta_alone_goes_to_the_llm():
+    for carrier in EXTRACTORS:
+        result = extract(carrier, "Book now\nETA 18/01/2026\n")
+        assert result["confidence"] < EXTRACTOR_MIN_CONFIDENCE, carrier
+
+
+def test_generic_labels_corroborated_on_separate_lines():
+    result = extract("hapag", "ETA 18/01/2026\nArrival | ANTWERP | 18/01/2026")
+    assert result["confidence"] >= EXTRACTOR_MIN_CONFIDENCE
+    assert extract("hapag", "ETA arrival 18/01/2026")["confidence"] < EXTRACTOR_MIN_CONFIDENCE
+
+
+def test_latest_strongest_label_wins():
+    text = (
+        "Vessel arrival | SINGAPORE | 2026-01-05\n"
+        "Vessel arrival | ANTWERP | 2026-01-18\n"
+    )
+    assert extract("hapag", text)["latest_date"] == "18-Jan-2026"
+
+
+def test_value_under_heading():
+    result = extract("evergreen", "Estimated Date of Arrival\nJAN-18-2026\n")
+    assert result["latest_date"] == "18-Jan-2026"
+
+
+def test_past_eta_is_arrived():
+    assert extract("msc", "POD ETA 18/12/2025")["status"] == "Arrived"
+
+
+def test_delivered_only_counts_in_events():
+    faq = "FAQ: when is my cargo delivered?\nPOD ETA 18/01/2026"
+    assert extract("msc", faq)["status"] == "In Transit"
+    assert extract("msc", "POD ETA 18/01/2026\n17/01/2026 ANTWERP Delivered")["status"] == "Delivered"
+    assert extract("msc", "POD ETA 18/01/2026\n17/01/2026\nANTWERP\nDelivered")["status"] == "Delivered"
+    assert extract("msc", "POD ETA 18/01/2026\nStatus: Delivered")["status"] == "Delivered"
+
+
+def test_not_found_page():
+    result = extract("cma", "No results found for this container")
+    assert result["status"] == "Not Found"
+    assert result["confidence"] == 0.0
+
+
+def test_routing_and_threshold():
+    assert extractor_for("Hyundai (HMM)").name == "hmm"
+    assert extractor_for("Unknown") is None
+    assert extract_eta("Book now\nETA 18/01/2026", "MSC") is None
+    assert extract_eta("POD ETA 18/01/2026", "MSC")["latest_date"] == "18-Jan-2026"
@@ -0,0 +1,48 @@
+import asyncio
+
+from services.http_client import get_client, close_clients, pool_stats
+
+
+def test_pool_stats_for_shared_clients():
+    async def run():
+        get_client("stats-test")
+        stats = pool_stats()["stats-test"]
+        await close_clients()
+        return stats, pool_stats()
+
+    stats, after_close = asyncio.run(run())
+    assert stats["requests_total"] == 0
+    assert stats["in_flight"] == 0
+    assert after_close == {}
+
+
+def test_shared_client_honours_env_proxy(monkeypatch):
+    for name in ("NO_PROXY", "no_proxy", "ALL_PROXY", "all_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    seen = []
+
+    async def proxy(reader, writer):
+        seen.append(await reader.readline())
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+        await writer.drain()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(proxy, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        monkeypatch.setenv("HTTP_PROXY", f"http://127.0.0.1:{port}")
+        try:
+            response = await get_client("proxy-test").get("http://tracking.invalid/status")
+            return response.text, pool_stats()["proxy-test"]
+        finally:
+            await close_clients()
+            server.close()
+            await server.wait_closed()
+
+    text, stats = asyncio.run(run())
+    assert text == "ok"
+    assert seen[0].startswith(b"GET http://tracking.invalid/status")
+    assert stats["requests_total"] == 1
+    assert stats["in_flight"] == 0
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from services import jobs
+from services.jobs import JobManager
+
+
+@pytest.fixture
+def tracked(monkeypatch):
+    """Replaces the tracker; containers named "SLOW..." block until cancelled."""
+    calls = []
+
+    async def fake_track(number, carrier="Unknown", system_eta="N/A", profile=None):
+        calls.append((number, carrier, system_eta, profile))
+        if number.startswith("SLOW"):
+            await asyncio.sleep(60)
+        return {"tracking_number": number, "status": "In Transit"}
+
+    monkeypatch.setattr(jobs, "track_container", fake_track)
+    return calls
+
+
+async def wait_for(manager, job_id, status, timeout=2):
+    for _ in range(int(timeout / 0.01)):
+        if manager.get(job_id)["status"] == status:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(manager.get(job_id)["status"])
+
+
+def test_job_runs_to_completion(tmp_path, tracked):
+    async def run():
+        manager = JobManager(str(tmp_path / "jobs.db"), workers=2)
+        await manager.start()
+        job_id = manager.submit([("MSCU1", "MSC", "N/A", None), ("HLXU2", "Hapag", "N/A", "fast")])
+        await wait_for(manager, job_id, "completed")
+        job = manager.get(job_id)
+        await manager.stop()
+        return job
+
+    job = asyncio.run(run())
+    assert job["counts"]["done"] == 2
+    assert sorted(tracked) == [("HLXU2", "Hapag", "N/A", "fast"), ("MSCU1", "MSC", "N/A", None)]
+    assert [item["result"]["tracking_number"] for item in job["items"]] == ["MSCU1", "HLXU2"]
+
+
+def test_cancel_stops_pending_and_running_items(tmp_path, tracked):
+    async def run():
+        manager = JobManager(str(tmp_path / "jobs.db"), workers=1)
+        await manager.start()
+        job_id = manager.submit([("SLOW1", "MSC", "N/A", None), ("MSCU2", "MSC", "N/A", None)])
+        await wait_for(manager, job_id, "running")
+        assert manager.cancel(job_id) is True
+        job = manager.get(job_id)
+        second = manager.cancel(job_id)
+        await manager.stop()
+        return job, second
+
+    job, second = asyncio.run(run())
+    assert job["status"] == "cancelled"
+    assert job["counts"]["cancelled"] == 2
+    assert second is False
+
+
+def test_cancel_leaves_finished_jobs_alone(tmp_path, tracked):
+    async def run():
+        manager = JobManager(str(tmp_path / "jobs.db"), workers=1)
+        await manager.start()
+        job_id = manager.submit([("MSCU1", "MSC", "N/A", None)])
+        await wait_for(manager, job_id, "completed")
+        result = manager.cancel(job_id)
+        status = manager.get(job_id)["status"]
+        unknown = manager.cancel("nope")
+        await manager.stop()
+        return result, status, unknown
+
+    assert asyncio.run(run()) == (False, "completed", None)
+
+
+def test_unfinished_items_resume_after_restart(tmp_path, tracked, monkeypatch):
+    path = str(tmp_path / "jobs.db")
+
+    async def first_run():
+        manager = JobManager(path, workers=1)
+        await manager.start()
+        job_id = manager.submit([("SLOW1", "MSC", "N/A", None), ("MSCU2", "MSC", "N/A", None)])
+        await wait_for(manager, job_id, "running")
+        # Shutdown interrupts SLOW1; MSCU2 never started
+        await manager.stop()
+        return job_id
+
+    job_id = asyncio.run(first_run())
+
+    resumed = []
+
+    async def fast_track(number, carrier="Unknown", system_eta="N/A", profile=None):
+        resumed.append(number)
+        return {"tracking_number": number, "status": "In Transit"}
+
+    monkeypatch.setattr(jobs, "track_container", fast_track)
+
+    async def second_run():
+        manager = JobManager(path, workers=1)
+        await manager.start()
+        await wait_for(manager, job_id, "completed")
+        job = manager.get(job_id)
+        await manager.stop()
+        return job
+
+    job = asyncio.run(second_run())
+    assert resumed == ["SLOW1", "MSCU2"]
+    assert job["counts"]["done"] == 2
+
+
+def test_completed_event_is_sent_once_without_reading_the_job(tmp_path, tracked, monkeypatch):
+    async def run():
+        manager = JobManager(str(tmp_path / "jobs.db"), workers=3)
+        await manager.start()
+        reads = []
+        get = manager.get
+        monkeypatch.setattr(manager, "get", lambda job_id: reads.append(job_id) or get(job_id))
+        job_id = manager.submit([(f"MSCU{i}", "MSC", "N/A", None) for i in range(6)])
+        events = manager.subscribe(job_id)
+        received = []
+        while not received or received[-1]["event"] != "completed":
+            received.append(await asyncio.wait_for(events.get(), 2))
+        await asyncio.sleep(0.05)
+        while not events.empty():
+            received.append(events.get_nowait())
+        await manager.stop()
+        return received, reads
+
+    received, reads = asyncio.run(run())
+    assert [event["event"] for event in received].count("completed") == 1
+    assert [event["event"] for event in received].count("item") == 12
+    assert reads == []
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from services import page_pool as page_pool_module
+from services.page_pool import CarrierPages, PagePool, WarmPage
+
+
+class FakePage:
+    def __init__(self, content):
+        self._content = content
+
+    async def content(self):
+        return self._content
+
+
+class FakeStates:
+    def __init__(self):
+        self.saved = []
+        self.invalidated = []
+
+    async def save(self, name, context):
+        self.saved.append(name)
+
+    def invalidate(self, name, reason):
+        self.invalidated.append(name)
+
+
+@pytest.fixture
+def states(monkeypatch):
+    fake = FakeStates()
+    monkeypatch.setattr(page_pool_module, "storage_states", fake)
+    return fake
+
+
+def lease(pool, content):
+    page = FakePage(content)
+    warm = WarmPage(context=object(), page=page)
+    pool._leased[page] = (CarrierPages("Test", prepare=None), warm)
+    return page, warm
+
+
+def test_succeeded_saves_a_clean_session(states):
+    pool = PagePool()
+    page, warm = lease(pool, "<html>Container MSCU1234567 Discharged 18/01/2026</html>")
+    asyncio.run(pool.succeeded(page))
+    assert states.saved == ["Test"]
+    assert not warm.blocked
+
+
+def test_succeeded_skips_a_challenge_page(states):
+    pool = PagePool()
+    page, warm = lease(pool, "<html><h1>Verify you are human</h1></html>")
+    asyncio.run(pool.succeeded(page))
+    assert states.saved == []
+    assert states.invalidated == ["Test"]
+    assert warm.blocked
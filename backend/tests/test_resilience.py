@@ -0,0 +1,123 @@
+import time
+import asyncio
+
+import httpx
+import pytest
+
+from services import cargoes_flow
+from services.resilience import TokenBucket, CircuitBreaker, CircuitOpenError, backoff_delay
+
+
+def test_breaker_opens_after_threshold_and_rejects():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+
+
+def test_breaker_half_open_trial_closes_or_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one trial at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+
+
+def test_token_bucket_waits_once_burst_is_spent():
+    bucket = TokenBucket(rate=100, burst=2)
+
+    async def run():
+        started = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.015
+    assert bucket.waited_seconds > 0
+
+
+def test_backoff_honours_retry_after_and_cap():
+    assert backoff_delay(0, 0.5, 8, "3") == 3
+    assert backoff_delay(0, 0.5, 8, "120") == 8
+    assert 0 <= backoff_delay(10, 0.5, 8) <= 8
+
+
+class FakeClient:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def get(self, url, params=None, headers=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome)
+
+
+@pytest.fixture
+def api(monkeypatch):
+    breaker = CircuitBreaker("test", failure_threshold=5, reset_timeout=60)
+    monkeypatch.setattr(cargoes_flow, "breaker", breaker)
+    monkeypatch.setattr(cargoes_flow, "rate_limiter", TokenBucket(1000, 1000))
+    monkeypatch.setattr(cargoes_flow, "BACKOFF_BASE", 0.001)
+
+    def use(outcomes):
+        client = FakeClient(outcomes)
+        monkeypatch.setattr(cargoes_flow, "get_client", lambda name: client)
+        return client, breaker
+    return use
+
+
+def test_api_get_retries_5xx_then_succeeds(api):
+    client, breaker = api([503, 200])
+    response = asyncio.run(cargoes_flow.api_get({}))
+    assert response.status_code == 200
+    assert client.calls == 2
+    assert breaker.failures == 0
+
+
+def test_api_get_does_not_retry_timeouts(api):
+    client, breaker = api([httpx.ReadTimeout("slow"), 200])
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(cargoes_flow.api_get({}))
+    assert client.calls == 1
+    assert breaker.failures == 1
+
+
+def test_api_get_counts_every_failed_attempt(api):
+    client, breaker = api([httpx.ConnectError("down")] * 4)
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(cargoes_flow.api_get({}))
+    assert client.calls == 4
+    assert breaker.failures == 4
+
+
+def test_api_get_stops_retrying_once_the_breaker_opens(api):
+    client, breaker = api([500] * 4)
+    breaker.failure_threshold = 2
+    response = asyncio.run(cargoes_flow.api_get({}))
+    assert response.status_code == 500
+    assert client.calls == 2
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(cargoes_flow.api_get({}))
+
+
+def test_api_get_respects_the_call_deadline(api, monkeypatch):
+    client, _ = api([500] * 4)
+    monkeypatch.setattr(cargoes_flow, "CALL_DEADLINE", 0)
+    asyncio.run(cargoes_flow.api_get({}))
+    assert client.calls == 1
@@ -0,0 +1,81 @@
+import json
+import asyncio
+
+from services import selector_race
+from services.selector_race import SelectorCache, race_selectors, wait_for_any_visible, visible
+
+
+class FakeLocator:
+    def __init__(self, count):
+        self._count = count
+
+    async def count(self):
+        return self._count
+
+
+class FakePage:
+    """Selectors in `shown` become visible after their delay; others never do."""
+
+    def __init__(self, shown):
+        self.shown = shown
+
+    async def wait_for_selector(self, selector, state="visible", timeout=30000):
+        base = selector.replace(" >> visible=true", "")
+        if base not in self.shown:
+            await asyncio.sleep(timeout / 1000)
+            raise TimeoutError(selector)
+        await asyncio.sleep(self.shown[base])
+
+    def locator(self, selector):
+        return FakeLocator(1 if selector.replace(" >> visible=true", "") in self.shown else 0)
+
+
+def test_wait_for_any_visible_skips_hidden_candidates():
+    page = FakePage({"#visible": 0.01})
+    assert asyncio.run(wait_for_any_visible(page, ["input[type='text']", "#visible"], timeout=200)) == "#visible"
+
+
+def test_wait_for_any_visible_times_out():
+    assert asyncio.run(wait_for_any_visible(FakePage({}), ["#a", "#b"], timeout=50)) is None
+
+
+def test_race_prefers_the_cached_winner(tmp_path, monkeypatch):
+    cache = SelectorCache(str(tmp_path / "selectors.json"), save_delay=0)
+    cache.record("cma", "input", "#second")
+    monkeypatch.setattr(selector_race, "selector_cache", cache)
+    page = FakePage({"#first": 0.0, "#second": 0.02})
+
+    async def run():
+        return await race_selectors(page, "cma", "input", ["#first", "#second"], timeout=200)
+
+    assert asyncio.run(run()) == visible("#second")
+
+
+def test_wins_are_saved_after_a_delay(tmp_path):
+    path = tmp_path / "selectors.json"
+
+    async def run():
+        cache = SelectorCache(str(path), save_delay=0.05)
+        cache.record("hmm", "result", ".result-area")
+        cache.record("hmm", "result", ".result-area")
+        assert not path.exists()
+        await asyncio.sleep(0.2)
+
+    asyncio.run(run())
+    assert json.loads(path.read_text()) == {"hmm/result": {".result-area": 2}}
+
+
+def test_race_wins_count_only_after_the_lookup_succeeds(tmp_path, monkeypatch):
+    cache = SelectorCache(str(tmp_path / "selectors.json"), save_delay=0)
+    monkeypatch.setattr(selector_race, "selector_cache", cache)
+    failed, succeeded = FakePage({"input[type='text']": 0.0}), FakePage({"#trackingNumber": 0.0})
+
+    async def run():
+        await race_selectors(failed, "cma", "input", ["#trackingNumber", "input[type='text']"], timeout=100)
+        cache.release(failed)
+        await race_selectors(succeeded, "cma", "input", ["#trackingNumber", "input[type='text']"], timeout=100)
+        cache.commit(succeeded)
+
+    asyncio.run(run())
+    assert cache.stats() == {"cma/input": "#trackingNumber"}
+    assert cache._wins["cma/input"] == {"#trackingNumber": 1}
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from services.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def lookup():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*[flight.do("MSCU1", lookup) for _ in range(5)])
+
+    assert asyncio.run(run()) == ["result"] * 5
+    assert len(calls) == 1
+    assert (flight.leaders, flight.coalesced) == (1, 4)
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight("test")
+
+    async def lookup():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("driver failed")
+
+    async def run():
+        return await asyncio.gather(*[flight.do("k", lookup) for _ in range(2)], return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(run()))
+
+
+def test_one_caller_leaving_does_not_cancel_the_others():
+    flight = SingleFlight("test")
+
+    async def lookup():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("k", lookup))
+        second = asyncio.ensure_future(flight.do("k", lookup))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "result"
+
+
+def test_later_calls_start_a_new_flight():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def lookup():
+        calls.append(1)
+        return len(calls)
+
+    async def run():
+        return [await flight.do("k", lookup), await flight.do("k", lookup)]
+
+    assert asyncio.run(run()) == [1, 2]
@@ -0,0 +1,32 @@
+from services.summaries import shipment_summary, eta_delta_text
+from services.holiday_utils import get_holidays_between_dates, format_holidays_for_summary
+from services.date_utils import get_date_range
+
+SHIPMENT = {"origin": "Nhava Sheva", "destination": "Antwerp", "latest_event": "Vessel Departure"}
+
+
+def test_eta_delta_text():
+    assert eta_delta_text("15/01/2026", "2026-01-18") == "3 days later than planned (15/01/2026)"
+    assert eta_delta_text("15/01/2026", "14/01/2026") == "1 day earlier than planned (15/01/2026)"
+    assert eta_delta_text("N/A", "2026-01-18") is None
+
+
+def test_summary_with_delta_and_holidays():
+    start, end = get_date_range("20/12/2025", "2026-01-02")
+    holidays = get_holidays_between_dates(start, end)
+    summary = shipment_summary(SHIPMENT, "20/12/2025", "2026-01-02", holidays)
+    assert summary.startswith(
+        "Vessel Departure from Nhava Sheva to Antwerp. ETA 02/01/2026, 13 days later than planned (20/12/2025). "
+    )
+    # Same holiday wording as the rest of the app
+    assert summary.endswith(format_holidays_for_summary(holidays) + ".")
+
+
+def test_summary_without_system_eta_or_holidays():
+    assert shipment_summary({"destination": "Antwerp"}, "N/A", "2026-01-18") == (
+        "In Transit to Antwerp. ETA 18/01/2026. No public holidays between the dates."
+    )
+
+
+def test_summary_without_live_eta():
+    assert shipment_summary(SHIPMENT, "15/01/2026", "N/A").endswith("ETA not available.")
@@ -0,0 +1,54 @@
+import json
+
+from services.text_reducer import reduce_raw_text, estimate_tokens
+
+NAV = "\n".join(["Home", "Login", "We use cookies on this site, accept all cookies " + "z" * 300] * 40)
+
+ROWS = [
+    ("15/01/2026", "NHAVA SHEVA", "Gate In"),
+    ("18/01/2026", "NHAVA SHEVA", "Export Loaded on Vessel"),
+    ("22/01/2026", "SINGAPORE", "Export Loaded on Vessel"),
+    ("18/02/2026", "ANTWERP", "Import Discharged from Vessel"),
+]
+
+
+def vertical_table():
+    return "\n".join(f"{date}\n{place}\n{event}" for date, place, event in ROWS)
+
+
+def test_short_text_is_untouched():
+    text = "Container MSCU1234567\nPOD ETA 18/01/2026 ANTWERP\n"
+    assert reduce_raw_text(text, budget_tokens=1000) == (text, estimate_tokens(text), estimate_tokens(text))
+
+
+def test_drops_page_chrome_and_keeps_the_timeline():
+    text, before, after = reduce_raw_text(
+        NAV + "\nTracking results\n" + vertical_table() + "\nBack to top\n" + NAV, budget_tokens=500
+    )
+    assert after < before
+    assert "cookies" not in text
+    assert "Login" not in text
+    for date, place, event in ROWS:
+        assert date in text
+
+
+def test_repeated_labels_stay_with_their_dates():
+    text, _, _ = reduce_raw_text(NAV + "\n" + vertical_table(), budget_tokens=500)
+    assert "22/01/2026\nSINGAPORE\nExport Loaded on Vessel" in text
+    assert "18/02/2026\nANTWERP\nImport Discharged from Vessel" in text
+
+
+def test_budget_drops_weak_lines_before_dated_rows():
+    rows = "\n".join(f"Vessel departure | PORT {i} | 0{i % 9 + 1}/01/2026" for i in range(60))
+    filler = "\n".join(f"Vessel schedule note {i}" for i in range(200))
+    text, _, after = reduce_raw_text(filler + "\n" + rows, budget_tokens=600)
+    assert after <= 600
+    assert "PORT 59" in text
+    assert "schedule note 0" not in text
+
+
+def test_json_payload_is_scored_per_value():
+    payload = {"Data": {"PodEtaDate": "18/01/2026", "Location": "ANTWERP"}, "junk": "y" * 8000}
+    text, _, _ = reduce_raw_text(json.dumps(payload), budget_tokens=200)
+    assert '"PodEtaDate": "18/01/2026"' in text
+    assert "yyyy" not in text
@@ -174,58 +174,79 @@ export default function Dashboard() {
     setProgress(0);
 
     let completed = 0;
-    const total = shipments.filter(s => s.selected).length;
+    // Remember which row each batch entry belongs to
+    const rowIndexes = shipments
+      .map((s, i) => (s.selected ? i : -1))
+      .filter(i => i !== -1);
+    const total = rowIndexes.length;
 
-    // We use a functional update pattern to ensure we always have latest state
-    for (let i = 0; i < shipments.length; i++) {
-      if (!shipments[i].selected) continue; // Skip unselected
+    // Mark all selected rows as loading
+    setShipments(prev => prev.map(s => s.selected ? { ...s, loading: true, status: "Processing..." } : s));
 
-      // Mark current row as loading
+    const applyResult = (i: number, data: any) => {
       setShipments(prev => {
         const newArr = [...prev];
-        newArr[i] = { ...newArr[i], loading: true, status: "Processing..." };
+        newArr[i] = {
+          ...newArr[i],
+          loading: false,
+          liveEta: data.live_eta || "N/A",
+          status: data.status || "Error",
+          summary: data.smart_summary || data.message || "No data",
+          co2: data.co2 || "N/A",
+          etaChanged: data.eta_changed || false
+        };
         return newArr;
       });
+      completed++;
+      setProgress(Math.round((completed / total) * 100));
+    };
 
-      try {
-        const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
-        const res = await fetch(`${API_BASE}/api/track/sea`, {
-          method: "POST",
-          headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({
-            number: shipments[i].trackingNumber,
-            carrier: shipments[i].carrier,
-            system_eta: shipments[i].systemEta
-          })
-        });
-
-        const data = await res.json();
-
-        // Update row with results
-        setShipments(prev => {
-          const newArr = [...prev];
-          newArr[i] = {
-            ...newArr[i],
-            loading: false,
-            liveEta: data.live_eta || "N/A",
-            status: data.status || "Error",
-            summary: data.smart_summary || data.message || "No data",
-            co2: data.co2 || "N/A",
-            etaChanged: data.eta_changed || false
-          };
-          return newArr;
-        });
-
-      } catch (error) {
-        setShipments(prev => {
-          const newArr = [...prev];
-          newArr[i] = { ...newArr[i], loading: false, status: "Network Error" };
-          return newArr;
-        });
+    try {
+      const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
+      const res = await fetch(`${API_BASE}/api/track/sea/batch`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(rowIndexes.map(i => ({
+          number: shipments[i].trackingNumber,
+          carrier: shipments[i].carrier,
+          system_eta: shipments[i].systemEta
+        })))
+      });
+
+      if (!res.ok || !res.body) {
+        throw new Error(`Server error ${res.status}`);
       }
 
-      completed++;
-      setProgress(Math.round((completed / total) * 100));
+      // Results stream back as NDJSON, one line per finished container
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      const applyLine = (line: string) => {
+        if (!line.trim()) return;
+        const data = JSON.parse(line);
+        applyResult(rowIndexes[data.index], data);
+      };
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split("\n");
+        buffer = lines.pop() || "";
+        lines.forEach(applyLine);
+      }
+      // The last line may arrive without a trailing newline
+      applyLine(buffer + decoder.decode());
+
+      // Rows the stream ended without answering
+      setShipments(prev => prev.map(s => s.loading
+        ? { ...s, loading: false, status: "Error", summary: "No result returned" }
+        : s));
+    } catch (error) {
+      // Anything still loading never got an answer
+      const message = error instanceof Error ? error.message : "Network Error";
+      setShipments(prev => prev.map(s => s.loading
+        ? { ...s, loading: false, status: "Network Error", summary: message }
+        : s));
     }
 
     setIsProcessing(false);